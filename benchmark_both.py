@@ -2,24 +2,39 @@
 # -*- coding: utf-8 -*-
 """
 Benchmark comparatif entre:
-- Version "base" (exhaustive)  -> dossier: code_base/code_base
-- Version "ref"  (glouton)     -> dossier: code_ref_Mi/code_ref_Mi
+- Version "base" (exhaustive)  -> dossier: code_base
+- Version "ref"  (glouton)     -> dossier: projet_groupe_Mialisoa
+
+Les versions "avant" (code_base.zip, code_ref_Mi.zip) se mesurent de la même
+façon une fois extraites, par exemple dans avant/ : les fonctions absentes de
+ces versions (filtre des groupes au chargement, budget et effort de l'exhaustif,
+compteurs du glouton) sont détectées et remplacées par les appels d'origine.
+
+Chaque exécution d'un solveur a lieu dans un processus dédié (spawn), tué s'il
+dépasse --hard-timeout : un exhaustif qui ne termine pas n'empêche plus d'obtenir
+le rapport. Pour chaque exécution sont relevés la mémoire (pic RSS du processus,
+ou pic tracemalloc du seul solveur avec --memory tracemalloc) et l'effort de
+recherche : nœuds explorés, feuilles évaluées, candidats évalués.
 
 Sortie: report/benchmark_results.json
 
 Usage (défauts OK si l'arborescence est intacte):
     python benchmark_both.py
 ou avec chemins explicites:
-    python benchmark_both.py --base ./code_base/code_base --ref ./code_ref_Mi/code_ref_Mi \
-        --xlsx "Groupes SAÉ S3 -constitution.xlsx" --sheet "Liste S3" --timeout 60
+    python benchmark_both.py --base ./avant/code_base --ref ./avant/code_ref_Mi \
+        --xlsx "Groupes SAÉ S3 -constitution.xlsx" --sheet "Liste S3" --timeout 60 --hard-timeout 120
 """
 from __future__ import annotations
 
 import argparse
+import inspect
 import json
+import sys
 import time
+import tracemalloc
 from dataclasses import asdict, dataclass
 from importlib.machinery import SourceFileLoader
+from multiprocessing import get_context
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 from collections import Counter
@@ -33,8 +48,14 @@ class BenchmarkResult:
     fairness: Optional[float]
     conflicts: Optional[int]
     duration_s: float
-    iterations: Optional[int] = None
-    attempts: Optional[int] = None
+    iterations: Optional[int] = None     # exhaustive: améliorations de la meilleure solution ; heuristic: placements + mouvements
+    attempts: Optional[int] = None       # heuristic: nombre de passes gloutonnes
+    nodes: Optional[int] = None          # nœuds de l'arbre de recherche explorés
+    leaves: Optional[int] = None         # répartitions complètes évaluées
+    candidates: Optional[int] = None     # exhaustive: bornes calculées ; heuristic: groupes candidats évalués
+    base_rss_kb: Optional[int] = None    # pic RSS du processus avant le solveur (données chargées)
+    peak_rss_kb: Optional[int] = None    # pic RSS du processus après le solveur
+    tracemalloc_peak_kb: Optional[int] = None
     note: Optional[str] = None
 
     def as_dict(self) -> Dict[str, object]:
@@ -92,6 +113,14 @@ def build_subset(groupe, taille: int, nb_groupes: int):
 
 
 # ---------- Chargement des APIs des deux versions ----------
+def accepts(fonction, parametre: str) -> bool:
+    """Vrai si fonction accepte l'argument nommé parametre (absent des versions avant)."""
+    try:
+        return parametre in inspect.signature(fonction).parameters
+    except (TypeError, ValueError):
+        return False
+
+
 def load_base_api(base_root: Path):
     """Charge l'API de la version 'base' (exhaustive)."""
     students = SourceFileLoader("base_students", str(base_root / "students.py")).load_module()
@@ -101,6 +130,8 @@ def load_base_api(base_root: Path):
         "GroupeTP": students.GroupeTP,
         "Repartition": students.Repartition,
         "load_groups": creer.load_groups,
+        # Repartition.resoudre (budget, effort) n'existe pas dans la version avant
+        "resoudre": hasattr(students.Repartition, "resoudre"),
     }
 
 
@@ -113,23 +144,35 @@ def load_ref_api(ref_root: Path):
         "GroupeTP": models.GroupeTP,
         "load_groups": xlsx_loader.load_groups,   # même signature (xlsx_path, sheet)
         "heuristic": glouton.creer_groupes_glouton,
+        "compteurs": accepts(glouton.creer_groupes_glouton, "compteurs"),
     }
 
 
+def load_groupe(api, xlsx: str, sheet: str, nom_groupe: str):
+    """Groupe de TD nom_groupe (None s'il n'existe pas), seul chargé si la version le permet."""
+    if accepts(api["load_groups"], "groupes"):
+        groupes = api["load_groups"](xlsx, sheet, groupes=nom_groupe)
+    else:
+        groupes = api["load_groups"](xlsx, sheet)
+    return groupes.get(nom_groupe)
+
+
 # ---------- Exécution d'un scénario ----------
 def run_exhaustive(base_api, groupe, nb: int, timeout: Optional[int]) -> BenchmarkResult:
-    """Version exhaustive (base). Utilise Repartition.faire → renvoie un dict de groupes."""
+    """Version exhaustive (base). Utilise Repartition.resoudre, ou Repartition.faire
+    dans la version avant (sans budget ni effort : seul --hard-timeout l'arrête)."""
     start = time.perf_counter()
     try:
-        if timeout is not None:
-            # Timeout soft : on mesure et on laisse l'utilisateur gérer si ça dépasse
-            pass
-        groupes = base_api["Repartition"].faire(groupe, nb=nb)
+        if not base_api["resoudre"]:
+            return run_faire(base_api, groupe, nb, start)
+        # Avec un timeout, la recherche s'arrête et renvoie la meilleure répartition trouvée
+        res = base_api["Repartition"].resoudre(groupe, nb=nb, budget_s=timeout)
+        groupes = res.groupes
         duration = time.perf_counter() - start
         if not groupes:
             return BenchmarkResult(
                 scenario=getattr(groupe, "nom", "scenario"),
-                method="exhaustive_error",
+                method="exhaustive_error" if res.optimal else "exhaustive_timeout",
                 fairness=None,
                 conflicts=None,
                 duration_s=duration,
@@ -138,10 +181,15 @@ def run_exhaustive(base_api, groupe, nb: int, timeout: Optional[int]) -> Benchma
         fairness, conflicts = group_totals_and_conflicts(groupes)
         return BenchmarkResult(
             scenario=getattr(groupe, "nom", "scenario"),
-            method="exhaustive",
+            method="exhaustive" if res.optimal else "exhaustive_timeout",
             fairness=round(fairness, 6),
             conflicts=int(conflicts),
             duration_s=duration,
+            iterations=res.effort.get("ameliorations"),
+            nodes=res.effort.get("noeuds"),
+            leaves=res.effort.get("feuilles"),
+            candidates=res.effort.get("bornes"),
+            note=None if res.optimal else f"Timeout {timeout}s : optimalité non prouvée",
         )
     except KeyboardInterrupt:
         # Si l'utilisateur stoppe manuellement
@@ -166,12 +214,40 @@ def run_exhaustive(base_api, groupe, nb: int, timeout: Optional[int]) -> Benchma
         )
 
 
+def run_faire(base_api, groupe, nb: int, start: float) -> BenchmarkResult:
+    """Exhaustif de la version avant : Repartition.faire → renvoie un dict de groupes."""
+    groupes = base_api["Repartition"].faire(groupe, nb=nb)
+    duration = time.perf_counter() - start
+    if not groupes:
+        return BenchmarkResult(
+            scenario=getattr(groupe, "nom", "scenario"),
+            method="exhaustive_error",
+            fairness=None,
+            conflicts=None,
+            duration_s=duration,
+            note="Aucune répartition trouvée (exhaustive)",
+        )
+    fairness, conflicts = group_totals_and_conflicts(groupes)
+    return BenchmarkResult(
+        scenario=getattr(groupe, "nom", "scenario"),
+        method="exhaustive",
+        fairness=round(fairness, 6),
+        conflicts=int(conflicts),
+        duration_s=duration,
+    )
+
+
 def run_heuristic(ref_api, groupe, nb: int, attempts: Optional[int] = None) -> BenchmarkResult:
     """Version gloutonne (ref). Utilise creer_groupes_glouton → renvoie un dict de groupes."""
     start = time.perf_counter()
+    compteurs: Dict[str, int] = {}
     try:
-        # L'implémentation fournie n'accepte pas attempts/allow_conflicts
-        groupes = ref_api["heuristic"](groupe, nb)
+        # L'implémentation fournie n'accepte pas attempts/allow_conflicts ;
+        # la version avant n'a pas non plus de compteurs
+        if ref_api["compteurs"]:
+            groupes = ref_api["heuristic"](groupe, nb, compteurs=compteurs)
+        else:
+            groupes = ref_api["heuristic"](groupe, nb)
         duration = time.perf_counter() - start
         if not groupes:
             return BenchmarkResult(
@@ -189,7 +265,9 @@ def run_heuristic(ref_api, groupe, nb: int, attempts: Optional[int] = None) -> B
             fairness=round(fairness, 6),
             conflicts=int(conflicts),
             duration_s=duration,
-            attempts=attempts,
+            iterations=(compteurs.get("placements", 0) + compteurs.get("mouvements", 0)) if compteurs else None,
+            attempts=attempts if attempts is not None else 1,
+            candidates=compteurs.get("candidats"),
         )
     except Exception as e:
         duration = time.perf_counter() - start
@@ -203,21 +281,104 @@ def run_heuristic(ref_api, groupe, nb: int, attempts: Optional[int] = None) -> B
         )
 
 
+# ---------- Exécution isolée ----------
+def _rss_kb() -> Optional[int]:
+    """Pic RSS du processus courant en Ko (None si indisponible, ex. Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pic // 1024 if sys.platform == "darwin" else pic  # octets sous macOS
+
+
+def _run_child(conn, method: str, root: str, xlsx: str, sheet: str, nom_groupe: str,
+               subset: Optional[int], nb: int, timeout: Optional[float], memory: str) -> None:
+    """Processus enfant : charge la version, le groupe demandé, puis exécute le solveur."""
+    try:
+        # Les modules de chaque version s'importent entre eux par leur nom (grouping, ...)
+        sys.path.insert(0, root)
+        api = load_base_api(Path(root)) if method == "exhaustive" else load_ref_api(Path(root))
+        groupe = load_groupe(api, xlsx, sheet, nom_groupe)
+        if groupe is None:
+            conn.send(None)
+            return
+        if subset is not None:
+            groupe = build_subset(groupe, taille=subset, nb_groupes=nb)
+
+        base_rss = _rss_kb()
+        if memory == "tracemalloc":
+            tracemalloc.start()
+        if method == "exhaustive":
+            result = run_exhaustive(api, groupe, nb=nb, timeout=timeout)
+        else:
+            result = run_heuristic(api, groupe, nb=nb, attempts=None)
+        if memory == "tracemalloc":
+            result.tracemalloc_peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+            tracemalloc.stop()
+        result.base_rss_kb, result.peak_rss_kb = base_rss, _rss_kb()
+        conn.send(asdict(result))
+    except Exception as e:
+        conn.send({"error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_isolated(method: str, root: Path, xlsx: Path, sheet: str, nom_groupe: str,
+                 subset: Optional[int], nb: int, timeout: Optional[float],
+                 hard_timeout: Optional[float], memory: str) -> Optional[BenchmarkResult]:
+    """Exécute un solveur dans un processus tué au bout de hard_timeout secondes.
+
+    Retourne None si le groupe n'existe pas dans le fichier Excel.
+    """
+    ctx = get_context("spawn")
+    recv, send = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_run_child,
+                       args=(send, method, str(root), str(xlsx), sheet, nom_groupe, subset, nb, timeout, memory))
+    start = time.perf_counter()
+    proc.start()
+    send.close()
+    scenario = nom_groupe if subset is None else f"{nom_groupe}-subset{subset}"
+    try:
+        if recv.poll(hard_timeout):
+            data = recv.recv()
+        else:
+            proc.kill()
+            proc.join()
+            return BenchmarkResult(
+                scenario=scenario,
+                method=f"{method}_timeout",
+                fairness=None,
+                conflicts=None,
+                duration_s=time.perf_counter() - start,
+                note=f"Processus tué après {hard_timeout}s (chargement compris)",
+            )
+    except EOFError:
+        data = {"error": f"Processus terminé sans résultat (code {proc.exitcode})"}
+    finally:
+        proc.join()
+        recv.close()
+    if data is None:
+        return None
+    if "error" in data:
+        return BenchmarkResult(scenario=scenario, method=f"{method}_error", fairness=None, conflicts=None,
+                               duration_s=time.perf_counter() - start, note=data["error"])
+    return BenchmarkResult(**data)
+
+
 # ---------- Programme principal ----------
 def main() -> None:
     parser = argparse.ArgumentParser(description="Benchmark helpers comparing exhaustive and heuristic group generation for both project versions.")
-    parser.add_argument("--base", type=Path, default=Path("code_base") / "code_base", help="Chemin vers la racine de la version base")
-    parser.add_argument("--ref", type=Path, default=Path("code_ref_Mi") / "code_ref_Mi", help="Chemin vers la racine de la version ref")
+    parser.add_argument("--base", type=Path, default=Path("code_base"), help="Chemin vers la racine de la version base")
+    parser.add_argument("--ref", type=Path, default=Path("projet_groupe_Mialisoa"), help="Chemin vers la racine de la version ref")
     parser.add_argument("--xlsx", type=Path, default=Path("Groupes SAÉ S3 -constitution.xlsx"), help="Fichier Excel des étudiants")
     parser.add_argument("--sheet", type=str, default="Liste S3", help="Nom de la feuille Excel")
-    parser.add_argument("--timeout", type=int, default=None, help="Timeout doux (secondes) pour l'exhaustif (indicatif)")
+    parser.add_argument("--timeout", type=float, default=None, help="Budget (secondes) de l'exhaustif, qui renvoie alors la meilleure solution trouvée")
+    parser.add_argument("--hard-timeout", type=float, default=600.0, help="Durée (secondes) au-delà de laquelle le processus d'un solveur est tué")
+    parser.add_argument("--memory", choices=["rss", "tracemalloc"], default="rss", help="Mesure mémoire : pic RSS du processus, ou pic tracemalloc du solveur (plus lent)")
     parser.add_argument("--output", type=Path, default=Path("report") / "benchmark_results.json", help="Fichier de sortie JSON")
     args = parser.parse_args()
 
-    # Charger APIs
-    base_api = load_base_api(args.base)
-    ref_api = load_ref_api(args.ref)
-
     # Charger données — on tente d'abord à partir de --xlsx tel quel.
     xlsx_file = args.xlsx
     if not xlsx_file.exists():
@@ -231,39 +392,30 @@ def main() -> None:
         else:
             raise FileNotFoundError(f"Impossible de trouver le fichier Excel: {args.xlsx}")
 
-    # Groupes depuis les deux versions (pour robustesse, on lit via la version 'ref' qui a un loader dédié)
-    try:
-        groupes_ref = ref_api["load_groups"](str(xlsx_file), args.sheet)
-        groupes_base = base_api["load_groups"](str(xlsx_file), args.sheet)
-    except Exception:
-        # fallback : si un des loaders ne passe pas, on réutilise l'autre
-        groupes_ref = ref_api["load_groups"](str(xlsx_file), args.sheet)
-        groupes_base = groupes_ref
-
+    def run(method: str, nom_groupe: str, subset: Optional[int] = None) -> Optional[BenchmarkResult]:
+        root = (args.base if method == "exhaustive" else args.ref).resolve()
+        return run_isolated(method, root, xlsx_file.resolve(), args.sheet, nom_groupe, subset, 3,
+                            args.timeout, args.hard_timeout, args.memory)
+
+    # Scénarios : (méthode, groupe, taille du sous-ensemble, nom affiché)
+    scenarios = [
+        # -------- Scénario 1 : 1A, deux méthodes --------
+        ("exhaustive", "1A", None, None),
+        ("heuristic", "1A", None, None),
+        # -------- Scénario 2 : 2B subset (12 étudiants), comparatif --------
+        ("exhaustive", "2B", 12, None),
+        ("heuristic", "2B", 12, None),
+        # -------- Scénario 3 : 2B complet (heuristic only) --------
+        ("heuristic", "2B", None, "2B_full"),
+    ]
     results: List[BenchmarkResult] = []
-
-    # -------- Scénario 1 : 1A, deux méthodes --------
-    if "1A" in groupes_base:
-        g1a_base = groupes_base["1A"]
-        g1a_ref = groupes_ref["1A"]
-        results.append(run_exhaustive(base_api, g1a_base, nb=3, timeout=args.timeout))
-        results.append(run_heuristic(ref_api, g1a_ref, nb=3, attempts=None))
-
-    # -------- Scénario 2 : 2B subset (12 étudiants), comparatif --------
-    if "2B" in groupes_base:
-        g2b_base = groupes_base["2B"]
-        g2b_ref = groupes_ref["2B"]
-        subset_base = build_subset(g2b_base, taille=12, nb_groupes=3)
-        subset_ref = build_subset(g2b_ref, taille=12, nb_groupes=3)
-        results.append(run_exhaustive(base_api, subset_base, nb=3, timeout=args.timeout))
-        results.append(run_heuristic(ref_api, subset_ref, nb=3, attempts=None))
-
-    # -------- Scénario 3 : 2B complet (heuristic only) --------
-    if "2B" in groupes_ref:
-        g2b_full = groupes_ref["2B"]
-        r = run_heuristic(ref_api, g2b_full, nb=3, attempts=None)
-        # On marque explicitement le scénario
-        r.scenario = "2B_full"
+    for method, nom_groupe, subset, scenario in scenarios:
+        r = run(method, nom_groupe, subset)
+        if r is None:
+            continue
+        if scenario is not None:
+            # On marque explicitement le scénario
+            r.scenario = scenario
         results.append(r)
 
     # Écriture
@@ -275,10 +427,12 @@ def main() -> None:
     # Affichage console
     print(f"\nRésultats ({out_path}):")
     for r in results:
+        memoire = r.tracemalloc_peak_kb if r.tracemalloc_peak_kb is not None else r.peak_rss_kb
         print(
             f"- {r.scenario:>12s} | {r.method:18s} | "
             f"fairness={r.fairness!s:>8s} | conflicts={r.conflicts!s:>4s} | "
-            f"t={r.duration_s:.4f}s"
+            f"t={r.duration_s:.4f}s | nodes={r.nodes!s:>8s} | candidates={r.candidates!s:>8s} | "
+            f"mem={memoire!s:>7s}Ko"
         )
 
 
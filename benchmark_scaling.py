@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de passage à l'échelle sur des promotions synthétiques.
+
+Les groupes de TD sont générés à partir de paramètres (nombre d'étudiants,
+nombre de groupes, proportion de leaders, densité de polarités, distribution
+des avantages), puis chaque solveur disponible est exécuté sur une plage de
+tailles, plusieurs fois par instance :
+- version "base" (code_base)               -> exhaustif (branch & bound), dp
+- version "projet" (projet_groupe_Mialisoa) -> glouton, glouton + recherche locale
+
+Les deux versions définissent des modules de même nom (grouping, ...) : chacune
+est donc exécutée dans son propre processus (spawn).
+
+Sortie: report/scaling.json et report/scaling.csv (une ligne par solveur,
+taille et graine), prêtes pour tracer durée et fairness en fonction de n.
+
+Usage:
+    python benchmark_scaling.py --sizes 9 12 15 18 21 24 30 45 60 --seeds 3 --repeats 5
+    python benchmark_scaling.py --save-baseline report/scaling_baseline.json
+    python benchmark_scaling.py --baseline report/scaling_baseline.json --threshold 0.25
+(avec --baseline, le code de sortie vaut 1 si une régression dépasse le seuil)
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import csv
+import importlib
+import io
+import json
+import math
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from benchmark_both import group_totals_and_conflicts
+
+ROOT = Path(__file__).resolve().parent
+
+# Solveurs de chaque version : nom -> dossier de la version
+SOLVERS = {
+    "exhaustive": "code_base",
+    "dp": "code_base",
+    "heuristic": "projet_groupe_Mialisoa",
+    "heuristic_ls": "projet_groupe_Mialisoa",
+}
+# Module définissant Etudiant et GroupeTP dans chaque version
+MODELS = {"code_base": "students", "projet_groupe_Mialisoa": "models"}
+# Modules des solveurs de chaque version, importés avant toute mesure
+SOLVER_MODULES = {"code_base": ("students",), "projet_groupe_Mialisoa": ("glouton",)}
+
+# Valeurs d'avantage observées dans le fichier Excel de la promotion
+GRILLE_AVANTAGES = (0.1, 0.4, 0.6, 0.7, 0.8, 0.9, 1.1, 1.2, 1.5, 1.7, 2.2)
+
+
+# ---------- Génération ----------
+@dataclass
+class WorkloadSpec:
+    n: int
+    nb_groupes: int = 3
+    leaders: float = 0.3          # proportion de leaders (au moins nb_groupes)
+    polarity: float = 0.3         # proportion d'étudiants ayant une polarité
+    distribution: str = "grid"    # "grid" | "uniform" | "normal"
+    seed: int = 0
+
+
+def generate_roster(spec: WorkloadSpec) -> List[Tuple[str, str, float, bool, Optional[int]]]:
+    """Étudiants (nom, prénom, avantage, leader, polarité) d'un groupe de TD synthétique.
+
+    Chaque polarité est partagée par au plus nb_groupes étudiants et il y a au moins
+    nb_groupes leaders : l'instance est faisable si la taille le permet.
+    """
+    rng = random.Random(f"{spec.n}/{spec.nb_groupes}/{spec.seed}")
+    if spec.distribution == "grid":
+        avantages = [rng.choice(GRILLE_AVANTAGES) for _ in range(spec.n)]
+    elif spec.distribution == "uniform":
+        avantages = [round(rng.uniform(0.0, 2.5), 1) for _ in range(spec.n)]
+    elif spec.distribution == "normal":
+        avantages = [round(min(2.5, max(0.0, rng.gauss(1.1, 0.5))), 1) for _ in range(spec.n)]
+    else:
+        raise ValueError(f"Distribution inconnue : {spec.distribution}")
+
+    nb_leaders = min(spec.n, max(spec.nb_groupes, round(spec.leaders * spec.n)))
+    leaders = set(rng.sample(range(spec.n), nb_leaders))
+    polarises = rng.sample(range(spec.n), round(spec.polarity * spec.n))
+    nb_classes = max(1, math.ceil(len(polarises) / spec.nb_groupes))
+    polarites = {i: 1 + k % nb_classes for k, i in enumerate(polarises)}
+    return [(f"nom{i}", f"etu{i}", avantages[i], i in leaders, polarites.get(i)) for i in range(spec.n)]
+
+
+# ---------- Exécution (processus d'une version) ----------
+def _init_worker(dossier: str) -> None:
+    sys.path.insert(0, str(ROOT / dossier))
+    # Importés ici pour que la première exécution chronométrée ne paie pas l'import
+    for module in (MODELS[dossier],) + SOLVER_MODULES[dossier]:
+        importlib.import_module(module)
+
+
+def _build_groupe(roster, nom: str, dossier: str):
+    # Etudiant et GroupeTP sont définis dans students.py (base) ou models.py (projet)
+    module = importlib.import_module(MODELS[dossier])
+    Etudiant, GroupeTP = module.Etudiant, module.GroupeTP
+    etudiants = [Etudiant(nom=n, prenom=p, avantage=a, leader=l, polarite=pol) for n, p, a, l, pol in roster]
+    return GroupeTP(nom, etudiants)
+
+
+def _run_once(solver: str, groupe, nb: int, timeout: Optional[float]):
+    """Exécute un solveur ; retourne (groupes, optimal) où optimal vaut None si inconnu."""
+    if solver == "exhaustive":
+        from students import Repartition
+        res = Repartition.resoudre(groupe, nb=nb, budget_s=timeout)
+        return res.groupes, res.optimal
+    if solver == "dp":
+        from students import Repartition
+        res = Repartition.resoudre_dp(groupe, nb=nb, budget_s=timeout)
+        return res.groupes, res.optimal
+    from glouton import creer_groupes_glouton
+    groupes = creer_groupes_glouton(groupe, nb, amelioration=solver == "heuristic_ls",
+                                    budget_s=timeout if timeout is not None else 1.0)
+    return groupes, None
+
+
+def run_case(solver: str, roster, nom: str, nb: int, repeats: int, timeout: Optional[float]) -> Dict:
+    durations = []
+    for _ in range(repeats):
+        groupe = _build_groupe(roster, nom, SOLVERS[solver])
+        start = time.perf_counter()
+        # Les solveurs affichent leur progression : on ne garde que les mesures
+        with contextlib.redirect_stdout(io.StringIO()):
+            groupes, optimal = _run_once(solver, groupe, nb, timeout)
+        durations.append(time.perf_counter() - start)
+    fairness, conflicts = group_totals_and_conflicts(groupes) if groupes else (None, None)
+    return {"durations": durations, "fairness": fairness, "conflicts": conflicts, "optimal": optimal}
+
+
+# ---------- Résultats ----------
+@dataclass
+class ScalingResult:
+    solver: str
+    n: int
+    nb_groupes: int
+    seed: int
+    distribution: str
+    repeats: int
+    median_s: float
+    min_s: float
+    max_s: float
+    fairness: Optional[float]
+    conflicts: Optional[int]
+    status: str             # "ok" | "optimal" | "timeout" | "no_solution"
+
+    def key(self) -> str:
+        return f"{self.solver}/{self.distribution}/n={self.n}/g={self.nb_groupes}/seed={self.seed}"
+
+
+def make_result(solver: str, spec: WorkloadSpec, repeats: int, run: Dict) -> ScalingResult:
+    if run["fairness"] is None:
+        status = "timeout" if run["optimal"] is False else "no_solution"
+    elif run["optimal"] is None:
+        status = "ok"
+    else:
+        status = "optimal" if run["optimal"] else "timeout"
+    durations = run["durations"]
+    return ScalingResult(
+        solver=solver, n=spec.n, nb_groupes=spec.nb_groupes, seed=spec.seed,
+        distribution=spec.distribution, repeats=repeats,
+        median_s=statistics.median(durations), min_s=min(durations), max_s=max(durations),
+        fairness=None if run["fairness"] is None else round(run["fairness"], 6),
+        conflicts=run["conflicts"], status=status,
+    )
+
+
+def write_outputs(results: Sequence[ScalingResult], output: Path) -> None:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.with_suffix(".json").open("w", encoding="utf-8") as fh:
+        json.dump([asdict(r) for r in results], fh, indent=2, ensure_ascii=False)
+    with output.with_suffix(".csv").open("w", encoding="utf-8", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=[f.name for f in fields(ScalingResult)])
+        writer.writeheader()
+        for r in results:
+            writer.writerow(asdict(r))
+
+
+def compare_to_baseline(results: Sequence[ScalingResult], baseline: Path, threshold: float,
+                        min_delta_s: float) -> List[str]:
+    """Régressions par rapport à une exécution de référence (même solveur, taille et graine).
+
+    Une durée régresse si elle dépasse la référence de plus de threshold (relatif)
+    et de plus de min_delta_s (absolu, pour ignorer le bruit des petites durées) ;
+    la fairness et les conflits régressent dès qu'ils se dégradent, ou si la solution a disparu.
+    """
+    with baseline.open(encoding="utf-8") as fh:
+        reference = {ScalingResult(**d).key(): ScalingResult(**d) for d in json.load(fh)}
+    regressions = []
+    for r in results:
+        old = reference.get(r.key())
+        if old is None:
+            continue
+        if r.median_s > old.median_s * (1 + threshold) and r.median_s - old.median_s > min_delta_s:
+            regressions.append(f"{r.key()}: durée {old.median_s:.4f}s -> {r.median_s:.4f}s")
+        if old.fairness is not None and (r.fairness is None or r.fairness > old.fairness + 1e-6):
+            regressions.append(f"{r.key()}: fairness {old.fairness} -> {r.fairness}")
+        if old.conflicts is not None and r.conflicts is not None and r.conflicts > old.conflicts:
+            regressions.append(f"{r.key()}: conflicts {old.conflicts} -> {r.conflicts}")
+    return regressions
+
+
+# ---------- Programme principal ----------
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark de passage à l'échelle des solveurs sur des promotions synthétiques.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[9, 12, 15, 18, 21, 24, 30, 45, 60], help="Nombres d'étudiants testés")
+    parser.add_argument("--groups", type=int, default=3, help="Nombre de groupes de projet")
+    parser.add_argument("--leaders", type=float, default=0.3, help="Proportion de leaders")
+    parser.add_argument("--polarity", type=float, default=0.3, help="Proportion d'étudiants ayant une polarité")
+    parser.add_argument("--distribution", choices=["grid", "uniform", "normal"], default="grid", help="Distribution des avantages")
+    parser.add_argument("--seeds", type=int, default=3, help="Nombre d'instances par taille")
+    parser.add_argument("--repeats", type=int, default=3, help="Nombre d'exécutions chronométrées par instance")
+    parser.add_argument("--solvers", nargs="+", choices=sorted(SOLVERS), default=sorted(SOLVERS), help="Solveurs à exécuter")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Budget (secondes) par exécution des solveurs exacts")
+    parser.add_argument("--output", type=Path, default=Path("report") / "scaling", help="Préfixe des fichiers .json / .csv")
+    parser.add_argument("--baseline", type=Path, default=None, help="Résultats de référence (JSON) à comparer")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Ralentissement relatif toléré par rapport à la référence")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Ralentissement absolu (s) en dessous duquel on ignore l'écart")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Enregistre aussi les résultats comme référence")
+    args = parser.parse_args()
+
+    specs = [WorkloadSpec(n=n, nb_groupes=args.groups, leaders=args.leaders, polarity=args.polarity,
+                          distribution=args.distribution, seed=seed)
+             for n in sorted(args.sizes) for seed in range(args.seeds)]
+    results: List[ScalingResult] = []
+    contexte = get_context("spawn")
+    for dossier in sorted(set(SOLVERS[s] for s in args.solvers)):
+        # Un processus par version, réutilisé pour toutes ses mesures (séquentielles)
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexte,
+                                 initializer=_init_worker, initargs=(dossier,)) as pool:
+            for solver in (s for s in args.solvers if SOLVERS[s] == dossier):
+                abandon = None  # taille à partir de laquelle le solveur n'a plus terminé
+                for spec in specs:
+                    if abandon is not None and spec.n > abandon:
+                        continue
+                    roster = generate_roster(spec)
+                    run = pool.submit(run_case, solver, roster, f"synth{spec.n}-{spec.seed}",
+                                      spec.nb_groupes, args.repeats, args.timeout).result()
+                    r = make_result(solver, spec, args.repeats, run)
+                    results.append(r)
+                    print(f"- {solver:13s} | n={r.n:4d} | seed={r.seed} | {r.status:11s} | "
+                          f"fairness={r.fairness!s:>8s} | median={r.median_s:.4f}s")
+                    if r.status == "timeout":
+                        abandon = spec.n
+
+    write_outputs(results, args.output)
+    print(f"\nRésultats : {args.output.with_suffix('.json')} et {args.output.with_suffix('.csv')}")
+    if args.save_baseline:
+        write_outputs(results, args.save_baseline)
+        print(f"Référence enregistrée : {args.save_baseline.with_suffix('.json')}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.threshold, args.min_delta)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) par rapport à {args.baseline} :")
+            for ligne in regressions:
+                print(f"  {ligne}")
+            return 1
+        print(f"\nAucune régression par rapport à {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
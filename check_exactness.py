@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vérifie les solveurs exacts de code_base contre une énumération brute.
+
+Sur des groupes de TD synthétiques assez petits pour être énumérés (toutes les
+affectations aux tailles de g.repartition), chaque solveur doit retrouver la
+valeur optimale de l'énumération, ou conclure comme elle qu'aucune répartition
+valide n'existe :
+- recherche exacte (Repartition.resoudre) et programmation dynamique (resoudre_dp) ;
+- recherche parallèle (workers > 1), qui doit rendre la même répartition que la
+  recherche séquentielle ;
+- k meilleures répartitions (resoudre(..., k=K)) : mêmes K meilleurs écarts que les
+  K meilleures partitions distinctes de l'énumération ;
+- objectifs (objectifs.py) : même valeur optimale que l'énumération ;
+- énumération par lots numpy (faire_par_lots).
+
+Usage:
+    python check_exactness.py --cases 40 --seed 0
+(le code de sortie vaut 1 si un solveur s'écarte de l'énumération)
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import itertools
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT / "code_base"))
+
+from objectifs import EquilibreLeaders, Ecart, Ponderee, SeparationsSouples, Variance  # noqa: E402
+from students import Etudiant, GroupeTP, Repartition  # noqa: E402
+
+EPS = 1e-6
+GRILLE_AVANTAGES = (0.1, 0.4, 0.6, 0.7, 0.8, 0.9, 1.1, 1.2, 1.5, 1.7, 2.2)
+
+
+def initiale(e) -> str:
+    """Étiquette des séparations souples : l'initiale du prénom."""
+    return e.prenom[0]
+
+
+OBJECTIFS = {
+    "variance": Variance(),
+    "leaders": EquilibreLeaders(),
+    "separations": SeparationsSouples(initiale),
+    "ponderee": Ponderee((1, Ecart()), (0.5, SeparationsSouples(initiale))),
+}
+
+
+# ---------- Instances ----------
+def generate(rng: random.Random, numero: int) -> Tuple[GroupeTP, int]:
+    """Petit groupe de TD synthétique (6 à 10 étudiants) et son nombre de groupes."""
+    nb = rng.choice((2, 3))
+    n = rng.randint(2 * nb, 10 if nb == 2 else 9)
+    etudiants = [Etudiant(nom=f"nom{i}", prenom=rng.choice("ABC") + str(i),
+                          avantage=rng.choice(GRILLE_AVANTAGES), leader=rng.random() < 0.4,
+                          polarite=rng.choice((None, None, None, 1, 2)))
+                 for i in range(n)]
+    return GroupeTP(f"cas{numero}", etudiants), nb
+
+
+# ---------- Énumération brute ----------
+def enumerate_partitions(g: GroupeTP, nb: int) -> Dict[frozenset, List[List]]:
+    """Partitions valides distinctes (à renumérotation des groupes près) : clé -> membres de chaque groupe."""
+    tailles = g.repartition(nb)
+    partitions = {}
+    for affectation in itertools.product(range(nb), repeat=len(g.etudiants)):
+        compte = Counter(affectation)
+        if any(compte[k] != t for k, t in enumerate(tailles)):
+            continue
+        groupes = [[e for e, k2 in zip(g.etudiants, affectation) if k2 == k] for k in range(nb)]
+        if not all(valide(membres) for membres in groupes):
+            continue
+        cle = frozenset(frozenset(e.nom for e in membres) for membres in groupes)
+        partitions.setdefault(cle, groupes)
+    return partitions
+
+
+def valide(membres) -> bool:
+    polarites = [e.polarite for e in membres if e.polarite is not None]
+    return any(e.leader for e in membres) and len(polarites) == len(set(polarites))
+
+
+def ecart(groupes) -> float:
+    totaux = [sum(e.avantage for e in membres) for membres in groupes]
+    return max(totaux) - min(totaux)
+
+
+def cle_groupes(groupes: Optional[dict]) -> Optional[frozenset]:
+    if not groupes:
+        return None
+    return frozenset(frozenset(e.nom for e in gr.members) for gr in groupes.values())
+
+
+# ---------- Comparaisons ----------
+def same(valeur: Optional[float], attendue: Optional[float]) -> bool:
+    if valeur is None or attendue is None:
+        return valeur is None and attendue is None
+    return abs(valeur - attendue) <= EPS
+
+
+def check_case(g: GroupeTP, nb: int, k: int, parallele: bool) -> List[str]:
+    """Écarts des solveurs à l'énumération sur une instance (vide si tout concorde)."""
+    partitions = enumerate_partitions(g, nb)
+    ecarts = sorted(ecart(groupes) for groupes in partitions.values())
+    optimum = ecarts[0] if ecarts else None
+    erreurs = []
+
+    def verifier(nom: str, groupes: Optional[dict], attendue: Optional[float], valeur=None):
+        if groupes and not Repartition(*groupes.values()).validite():
+            erreurs.append(f"{g.nom} {nom}: répartition invalide")
+            return
+        if valeur is None and groupes:
+            valeur = ecart([gr.members for gr in groupes.values()])
+        if not same(valeur if groupes else None, attendue):
+            erreurs.append(f"{g.nom} {nom}: {valeur if groupes else None} au lieu de {attendue}")
+
+    res = Repartition.resoudre(g, nb=nb)
+    verifier("resoudre", res.groupes, optimum)
+    verifier("resoudre_dp", Repartition.resoudre_dp(g, nb=nb).groupes, optimum)
+    verifier("faire_par_lots", Repartition.faire_par_lots(g, nb=nb, taille_lot=64), optimum)
+    if parallele:
+        groupes = Repartition.resoudre(g, nb=nb, workers=2).groupes
+        verifier("parallele", groupes, optimum)
+        if cle_groupes(groupes) != cle_groupes(res.groupes):
+            erreurs.append(f"{g.nom} parallele: autre répartition que la recherche séquentielle")
+
+    # k meilleures partitions distinctes
+    solutions = Repartition.resoudre(g, nb=nb, k=k).solutions
+    obtenus = [rep.optimalite() for rep in solutions]
+    if len({cle_groupes(rep.groups) for rep in solutions}) != len(solutions):
+        erreurs.append(f"{g.nom} k={k}: partitions en double")
+    if not all(rep.validite() for rep in solutions):
+        erreurs.append(f"{g.nom} k={k}: répartition invalide")
+    if len(obtenus) != len(ecarts[:k]) or not all(same(a, b) for a, b in zip(obtenus, ecarts[:k])):
+        erreurs.append(f"{g.nom} k={k}: écarts {obtenus} au lieu de {ecarts[:k]}")
+
+    for nom, objectif in OBJECTIFS.items():
+        attendue = min((objectif.evaluer(groupes) for groupes in partitions.values()), default=None)
+        res = Repartition.resoudre(g, nb=nb, objectif=objectif)
+        verifier(f"objectif {nom}", res.groupes, attendue, res.score)
+    return erreurs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare les solveurs exacts de code_base à une énumération brute.")
+    parser.add_argument("--cases", type=int, default=40, help="Nombre d'instances aléatoires")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du générateur d'instances")
+    parser.add_argument("--k", type=int, default=3, help="Nombre de meilleures répartitions comparées")
+    parser.add_argument("--parallel-every", type=int, default=5,
+                        help="Recherche parallèle vérifiée sur une instance sur N (0 : jamais)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    erreurs, faisables = [], 0
+    for numero in range(args.cases):
+        g, nb = generate(rng, numero)
+        parallele = args.parallel_every > 0 and numero % args.parallel_every == 0
+        # Les solveurs affichent leur progression : on ne garde que les écarts
+        with contextlib.redirect_stdout(io.StringIO()):
+            erreurs_cas = check_case(g, nb, args.k, parallele)
+        faisables += bool(enumerate_partitions(g, nb))
+        erreurs.extend(erreurs_cas)
+
+    print(f"{args.cases} instance(s), dont {faisables} faisable(s)")
+    if erreurs:
+        print(f"{len(erreurs)} écart(s) à l'énumération :")
+        for ligne in erreurs:
+            print(f"  {ligne}")
+        return 1
+    print("Tous les solveurs concordent avec l'énumération")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vérifie que les modules partagés par les deux versions n'ont pas divergé.
+
+Chaque version s'exécute seule (python3 creer_groupes.py depuis son dossier) et
+importe ses modules par leur nom : les modules communs sont donc copiés dans
+projet_groupe_Mialisoa. La copie peut n'en garder qu'une partie (recherche.py),
+mais chaque définition de premier niveau qu'elle contient (fonction, classe,
+constante) doit être identique à celle de code_base.
+
+Usage:
+    python check_shared.py
+(le code de sortie vaut 1 si une définition diffère ou manque dans code_base)
+"""
+from __future__ import annotations
+
+import ast
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parent
+SOURCE = ROOT / "code_base"
+COPIE = ROOT / "projet_groupe_Mialisoa"
+
+# Modules de code_base copiés dans projet_groupe_Mialisoa
+SHARED = ("cache_solutions", "faisabilite", "objectifs", "recherche", "statistiques", "table_etudiants")
+
+
+def definitions(chemin: Path) -> Dict[str, str]:
+    """Définitions de premier niveau d'un module : nom -> arbre syntaxique (ast.dump)."""
+    arbre = ast.parse(chemin.read_text(encoding="utf-8"))
+    res = {}
+    for noeud in arbre.body:
+        if isinstance(noeud, (ast.FunctionDef, ast.ClassDef)):
+            res[noeud.name] = ast.dump(noeud)
+        elif isinstance(noeud, (ast.Assign, ast.AnnAssign)):
+            cibles = noeud.targets if isinstance(noeud, ast.Assign) else [noeud.target]
+            for cible in cibles:
+                if isinstance(cible, ast.Name):
+                    res[cible.id] = ast.dump(noeud)
+    return res
+
+
+def divergences(module: str) -> List[str]:
+    source = definitions(SOURCE / f"{module}.py")
+    copie = definitions(COPIE / f"{module}.py")
+    res = []
+    for nom, arbre in copie.items():
+        if nom not in source:
+            res.append(f"{module}.{nom} : absent de code_base")
+        elif arbre != source[nom]:
+            res.append(f"{module}.{nom} : diffère de code_base")
+    return res
+
+
+def main() -> int:
+    problemes = [ligne for module in SHARED for ligne in divergences(module)]
+    if problemes:
+        print(f"{len(problemes)} divergence(s) entre code_base et projet_groupe_Mialisoa :")
+        for ligne in problemes:
+            print(f"  {ligne}")
+        return 1
+    print(f"Modules partagés identiques : {', '.join(SHARED)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
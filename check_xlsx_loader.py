@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vérifie la lecture en flux du classeur (projet_groupe_Mialisoa/xlsx_loader.py).
+
+Sur de petits classeurs synthétiques (openpyxl), iter_groups doit produire les
+mêmes groupes que load_groups et arrêter la lecture dès que le bloc du dernier
+groupe demandé est refermé : le nombre de lignes lues est compté.
+
+Usage:
+    python check_xlsx_loader.py
+(le code de sortie vaut 1 si une vérification échoue)
+"""
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Sequence
+
+ROOT = Path(__file__).resolve().parent
+sys.path.insert(0, str(ROOT / "projet_groupe_Mialisoa"))
+
+from openpyxl import Workbook  # noqa: E402
+
+import xlsx_loader  # noqa: E402
+
+ENTETE = ("Nom", "Prénom", "Groupe", "Avantage compté", "« chef »", "À séparer")
+
+
+def ecrire_classeur(chemin: Path, blocs: Sequence[tuple]) -> None:
+    """Classeur d'une feuille 'Liste' : blocs = ((groupe, nombre d'étudiants), ...)."""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Liste"
+    ws.append(ENTETE)
+    for groupe, nombre in blocs:
+        for i in range(nombre):
+            ws.append((f"nom{i}", f"Prénom {groupe}{i}", groupe, 0.5 + i / 10, int(i == 0), None))
+    wb.save(chemin)
+
+
+class Compteur(xlsx_loader.Row):
+    """Row qui compte les lignes analysées."""
+    lues = 0
+
+    def __init__(self, index, row):
+        Compteur.lues += 1
+        super().__init__(index, row)
+
+
+def lire(chemin: Path, groupes) -> tuple:
+    """(noms et tailles des groupes produits par iter_groups, lignes lues)."""
+    Compteur.lues = 0
+    res = [(g.nom, len(g.etudiants)) for g in xlsx_loader.iter_groups(chemin, "Liste", groupes)]
+    return res, Compteur.lues
+
+
+def main() -> int:
+    xlsx_loader.Row = Compteur
+    erreurs: List[str] = []
+
+    def verifier(nom: str, obtenu, attendu):
+        if obtenu != attendu:
+            erreurs.append(f"{nom}: {obtenu} au lieu de {attendu}")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        chemin = Path(dossier) / "promo.xlsx"
+        ecrire_classeur(chemin, (("1A", 4), ("1B", 5), ("2A", 6)))
+        complet = {nom: len(g.etudiants) for nom, g in xlsx_loader.load_groups(chemin, "Liste").items()}
+        verifier("load_groups", complet, {"1A": 4, "1B": 5, "2A": 6})
+        verifier("iter_groups tous", lire(chemin, None), ([("1A", 4), ("1B", 5), ("2A", 6)], 15))
+        # Le groupe demandé est le premier : lecture arrêtée à la première ligne de 1B
+        verifier("iter_groups premier groupe", lire(chemin, "1A"), ([("1A", 4)], 5))
+        verifier("iter_groups deux premiers", lire(chemin, ["1B", "1A"]), ([("1A", 4), ("1B", 5)], 10))
+        verifier("iter_groups dernier groupe", lire(chemin, "2A"), ([("2A", 6)], 15))
+
+        # Lignes non consécutives : refusées si le groupe revient avant la fin de la lecture
+        ecrire_classeur(chemin, (("1A", 2), ("1B", 2), ("1A", 2)))
+        verifier("iter_groups bloc refermé", lire(chemin, "1B"), ([("1B", 2)], 5))
+        try:
+            lire(chemin, None)
+            erreurs.append("iter_groups non consécutif : aucune erreur")
+        except ValueError:
+            pass
+
+    if erreurs:
+        print(f"{len(erreurs)} échec(s) :")
+        for ligne in erreurs:
+            print(f"  {ligne}")
+        return 1
+    print("Lecture en flux conforme, arrêt anticipé vérifié")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
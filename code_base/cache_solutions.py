@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+""" Cache disque des répartitions déjà calculées.
+La clé est une empreinte canonique de la liste d'étudiants (avantage, leader,
+polarité, sans les noms ni l'ordre des lignes) complétée par le solveur et ses
+paramètres : modifier un nom ou trier le fichier Excel ne change pas la clé.
+Les entrées les moins récemment utilisées sont supprimées au-delà de max_entrees.
+"""
+
+
+""" Caractéristiques d'un étudiant prises en compte par les solveurs. """
+def signature(e) -> tuple:
+    return float(e.avantage), bool(e.leader), repr(e.polarite)
+
+
+""" Positions des étudiants dans l'ordre canonique. """
+def ordre_canonique(etudiants: Sequence) -> List[int]:
+    return sorted(range(len(etudiants)), key=lambda i: signature(etudiants[i]))
+
+
+class CacheSolutions(object):
+
+    def __init__(self, dossier='.cache_solutions', max_entrees: int = 256):
+        self.dossier = Path(dossier)
+        self.max_entrees = max_entrees
+
+    def empreinte(self, etudiants: Sequence, solveur: str, **parametres) -> str:
+        contenu = json.dumps([solveur, sorted(parametres.items()),
+                              sorted(signature(e) for e in etudiants)])
+        return hashlib.sha256(contenu.encode('utf-8')).hexdigest()
+
+    def _chemin(self, cle: str) -> Path:
+        return self.dossier / f'{cle}.json'
+
+    def lire(self, cle: str, etudiants: Sequence) -> Optional[List[int]]:
+        """ Indice du groupe de chaque étudiant (dans l'ordre de etudiants), None si absent. """
+        chemin = self._chemin(cle)
+        try:
+            with open(chemin, encoding='utf-8') as f:
+                canonique = json.load(f)['affectation']
+            os.utime(chemin)  # dernière utilisation, pour l'éviction LRU
+        except (OSError, ValueError, KeyError):
+            return None
+        if len(canonique) != len(etudiants):
+            return None
+        affectation = [0] * len(etudiants)
+        for rang, i in enumerate(ordre_canonique(etudiants)):
+            affectation[i] = canonique[rang]
+        return affectation
+
+    def ecrire(self, cle: str, etudiants: Sequence, affectation: Sequence[int]):
+        canonique = [affectation[i] for i in ordre_canonique(etudiants)]
+        self.dossier.mkdir(parents=True, exist_ok=True)
+        temporaire = self._chemin(cle).with_suffix('.tmp')
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump({'affectation': canonique}, f)
+        os.replace(temporaire, self._chemin(cle))
+        self._evincer()
+
+    def _evincer(self):
+        entrees = sorted(self.dossier.glob('*.json'), key=lambda p: p.stat().st_mtime_ns)
+        for chemin in entrees[:max(0, len(entrees) - self.max_entrees)]:
+            try:
+                chemin.unlink()
+            except OSError:
+                pass
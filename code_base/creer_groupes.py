@@ -1,64 +1,120 @@
+import argparse
 from operator import attrgetter
 import time
-from typing import Dict
-import sys
-import cProfile
+from typing import Dict, Sequence
 
+from cache_solutions import CacheSolutions
+from faisabilite import analyser
+from objectifs import OBJECTIFS, par_nom
+from statistiques import Statistiques, phase, profiler
 from students import GroupeTP, Etudiant, Repartition
 
 from openpyxl import load_workbook
 
 
+COLONNES = ('Prénom', 'Groupe', 'Avantage compté', '« chef »', 'À séparer')
+
+
 class Row(object):
 
-    def __init__(self, head, row):
-        self.head = head
+    def __init__(self, index, row):
+        self.index = index
         self.row = row
 
     def __getitem__(self, item):
-        for i, c in enumerate(self.head):
-            if c.value == item:
-                return self.row[i].value
-        raise KeyError(item)
+        i = self.index[item]
+        return self.row[i] if i < len(self.row) else None
+
 
+def index_colonnes(head: Sequence, colonnes: Sequence[str] = COLONNES) -> Dict[str, int]:
+    index = {}
+    for i, nom in enumerate(head):
+        if nom is not None:
+            index.setdefault(nom, i)
+    manquantes = [c for c in colonnes if c not in index]
+    if manquantes:
+        raise ValueError(f"Colonne(s) manquante(s) ou renommée(s) : {manquantes} "
+                         f"(colonnes trouvées : {list(index)})")
+    return index
 
-def load_groups(filename, sheet) -> Dict:
+
+def load_groups(filename, sheet, groupes=None) -> Dict:
+    if isinstance(groupes, str):
+        groupes = {groupes}
+    elif groupes is not None:
+        groupes = set(groupes)
     wb = load_workbook(filename=filename, data_only=True, read_only=True)
-    sh = wb[sheet]
-    head, *rows = sh.rows
-    res = {}
-    for r in rows:
-        r = Row(head, r)
-        nom_groupe = r['Groupe']
-        if nom_groupe:
-            groupe = res.setdefault(nom_groupe, GroupeTP(nom_groupe, etudiants=()))
-            etudiant = Etudiant(nom=r['Prénom'].split()[-1],
-                                prenom=r['Prénom'].split()[-1],
-                                avantage=r['Avantage compté'],
-                                leader=bool(r['« chef »']),
-                                polarite=r['À séparer'])
-            groupe.etudiants.append(etudiant)
+    try:
+        rows = wb[sheet].iter_rows(values_only=True)
+        index = index_colonnes(next(rows, ()))
+        res = {}
+        for r in rows:
+            r = Row(index, r)
+            nom_groupe = r['Groupe']
+            if nom_groupe and (groupes is None or nom_groupe in groupes):
+                groupe = res.setdefault(nom_groupe, GroupeTP(nom_groupe, etudiants=()))
+                prenom = r['Prénom'].split()[-1]
+                etudiant = Etudiant(nom=prenom,
+                                    prenom=prenom,
+                                    avantage=r['Avantage compté'],
+                                    leader=bool(r['« chef »']),
+                                    polarite=r['À séparer'])
+                groupe.etudiants.append(etudiant)
+    finally:
+        wb.close()
 
     return res
 
 
-def calcul(g: GroupeTP, nb):
+def calcul(g: GroupeTP, nb, workers=1, budget_s=None, budget_noeuds=None, cache=None, stats=None, k=1, objectif=None):
     print("Groupe :", g)
-    opt = Repartition.faire(g, nb=nb)
+    with phase(stats, 'resolution'):
+        res = Repartition.resoudre(g, nb=nb, workers=workers, budget_s=budget_s, budget_noeuds=budget_noeuds,
+                                   cache=cache, stats=stats, k=k, objectif=objectif)
+    opt = res.groupes
 
-    if not g:
-        print("Pas de composition de groupe trouvée")
-        return
+    with phase(stats, 'affichage'):
+        if not res.optimal:
+            print("Budget épuisé : meilleure répartition trouvée, optimalité non prouvée")
+        if not opt:
+            print("Pas de composition de groupe trouvée")
+            for raison in analyser(g.etudiants, g.repartition(nb)).raisons:
+                print(raison)
+            return
 
-    for g in opt:
-        print("%d %s" % (g,opt[g].members))
+        for g in opt:
+            print("%d %s" % (g,opt[g].members))
+        for rang, rep in enumerate(res.solutions[1:], start=2):
+            print(f"\nAlternative {rang} (écart {rep.optimalite():.2f})")
+            for g in rep.groups:
+                print("%d %s" % (g, rep.groups[g].members))
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Recherche exacte des groupes de projet d'un groupe de TD.")
+    parser.add_argument("groupe", help="Nom du groupe de TD (ex: 1A)")
+    parser.add_argument("--workers", type=int, default=1, help="Nombre de processus de recherche")
+    parser.add_argument("--budget", type=float, default=None, help="Temps maximal de recherche (secondes)")
+    parser.add_argument("--noeuds", type=int, default=None, help="Nombre maximal de nœuds explorés")
+    parser.add_argument("--cache", nargs="?", const=".cache_solutions", default=None,
+                        help="Réutilise les optimums déjà calculés (dossier, défaut : .cache_solutions)")
+    parser.add_argument("--alternatives", type=int, default=1,
+                        help="Nombre de meilleures répartitions distinctes à afficher")
+    parser.add_argument("--objectif", choices=list(OBJECTIFS), default=None,
+                        help="Critère à minimiser (défaut : écart des avantages)")
+    parser.add_argument("--stats", action="store_true", help="Affiche les statistiques de la recherche")
+    parser.add_argument("--profil", default=None, help="Profile l'exécution (cProfile) et l'enregistre dans ce fichier")
+    args = parser.parse_args()
+
     start = time.time() 
-    promo = load_groups('Groupes SAÉ S3 -constitution.xlsx', 'Liste S3')
-    calcul(promo[sys.argv[1]], 3)
+    stats = Statistiques() if args.stats else None
+    with profiler(args.profil):
+        with phase(stats, 'chargement'):
+            promo = load_groups('Groupes SAÉ S3 -constitution.xlsx', 'Liste S3', groupes=args.groupe)
+        cache = CacheSolutions(args.cache) if args.cache else None
+        calcul(promo[args.groupe], 3, args.workers, args.budget, args.noeuds, cache, stats, args.alternatives,
+               par_nom(args.objectif))
+    if stats is not None:
+        print()
+        print(stats.rapport())
     end = time.time()
     print(f"\n⏱ Temps d'exécution : {end - start:.3f} secondes")
-    
-
-    
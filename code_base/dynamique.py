@@ -0,0 +1,150 @@
+"""
+Exact solver by dynamic programming over reachable group states.
+
+Avantages are scaled to integers on their decimal grid, so the number of distinct
+group sums stays small. Students are added one at a time; a state records, for
+every group, (sum, size, has a leader, bitmask of polarities). States reached
+twice are merged, which is what makes the search pseudo-polynomial instead of
+enumerating assignments. Groups of equal capacity are interchangeable, so each
+state is stored with those groups sorted.
+"""
+import math
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from recherche import BudgetEpuise, echelle_entiere, glouton_valide, sommes_extremes
+from table_etudiants import TableEtudiants
+
+Groupe = Tuple[int, int, bool, int]
+Etat = Tuple[Groupe, ...]
+
+
+def _segments(capacites: Sequence[int]) -> List[int]:
+    """Start index of the run of equal capacities each group belongs to."""
+    debuts = []
+    for k, c in enumerate(capacites):
+        debuts.append(k if k == 0 or capacites[k - 1] != c else debuts[-1])
+    return debuts
+
+
+def _canonique(etat: list, debuts: List[int]) -> tuple:
+    res, k = [], 0
+    while k < len(etat):
+        fin = k
+        while fin + 1 < len(etat) and debuts[fin + 1] == debuts[k]:
+            fin += 1
+        res.extend(sorted(etat[k:fin + 1]))
+        k = fin + 1
+    return tuple(res)
+
+
+def _glouton(ordre: List[int], avantages: List[int], table: TableEtudiants,
+             capacites: Sequence[int]) -> Tuple[float, Optional[List[int]]]:
+    """
+    A quick valid greedy assignment (recherche.glouton_valide), whose spread is
+    used as an upper bound.
+
+    :return: (spread, group index of each student), (inf, None) if it fails
+    """
+    choix = glouton_valide([avantages[i] for i in ordre], [table.leaders[i] for i in ordre],
+                           [table.masque(i) for i in ordre], capacites)
+    if choix is None:
+        return math.inf, None
+    sommes = [0] * len(capacites)
+    affectation = [0] * len(ordre)
+    for i, k in zip(ordre, choix):
+        affectation[i] = k
+        sommes[k] += avantages[i]
+    return max(sommes) - min(sommes), affectation
+
+
+def resoudre(etudiants: Sequence, capacites: Sequence[int],
+             echeance: Optional[float] = None) -> Optional[List[int]]:
+    """
+    :param etudiants: the students, or their TableEtudiants
+    :param echeance: time.time() after which BudgetEpuise is raised (no partial
+    solution exists before the last student is placed)
+    :return: the group index of each student for an optimal valid assignment,
+    or None if no valid assignment exists
+    :raises BudgetEpuise: past echeance; its argument is the best valid
+    assignment known, the greedy upper bound's (None if the greedy failed)
+    """
+    if len(etudiants) != sum(capacites):
+        raise ValueError
+    table = TableEtudiants.de(etudiants)
+    avantages, _ = echelle_entiere(table.avantages)
+    # Polarised students first, then leaders: once they are all placed, polarity
+    # masks are dropped and leader flags are all set, so more states merge
+    ordre = sorted(range(len(table)),
+                   key=lambda i: (table.polarites[i] < 0, not table.leaders[i], -avantages[i]))
+    n = len(ordre)
+    nb_polarises = sum(table.polarites[i] >= 0 for i in ordre)
+    leaders_restants = [sum(table.leaders[i] for i in ordre[r:]) for r in range(n + 1)]
+    extremes = [sommes_extremes([avantages[i] for i in ordre[r:]]) for r in range(n + 1)]
+    total = sum(avantages)
+    plancher, plafond = total // len(capacites), -(-total // len(capacites))
+    # States that cannot reach the spread of a greedy solution are dropped
+    pire, gloutonne = _glouton(ordre, avantages, table, capacites)
+    debuts = _segments(capacites)
+
+    initial: Etat = tuple((0, 0, False, 0) for _ in capacites)
+    couches: List[Dict[Etat, Tuple[Etat, int]]] = [{initial: None}]
+    for rang, i in enumerate(ordre):
+        a, leader = avantages[i], bool(table.leaders[i])
+        bit = table.masque(i)
+        oublier = rang + 1 == nb_polarises
+        bas, hauts = extremes[rang + 1]
+        suivante = {}
+        for n_etat, etat in enumerate(couches[-1]):
+            if echeance is not None and not n_etat & 1023 and time.time() > echeance:
+                raise BudgetEpuise(gloutonne)
+            for k, (s, c, l, m) in enumerate(etat):
+                if c == capacites[k] or m & bit:
+                    continue
+                if k != debuts[k] and etat[k - 1] == etat[k]:
+                    continue  # same move as on the identical group just before
+                groupe = (s + a, c + 1, l or leader, 0 if oublier else m | bit)
+                if groupe[1] == capacites[k] and not groupe[2]:
+                    continue
+                nouveau = list(etat)
+                nouveau[k] = groupe
+                if oublier:
+                    nouveau = [(g[0], g[1], g[2], 0) for g in nouveau]
+                if sum(not g[2] for g in nouveau) > leaders_restants[rang + 1]:
+                    continue
+                borne = (max(plafond, max(g[0] + bas[cap - g[1]] for g, cap in zip(nouveau, capacites)))
+                         - min(plancher, min(g[0] + hauts[cap - g[1]] for g, cap in zip(nouveau, capacites))))
+                if borne > pire:
+                    continue
+                canon = _canonique(nouveau, debuts)
+                if canon not in suivante:
+                    suivante[canon] = (etat, k)
+        couches.append(suivante)
+        if not suivante:
+            return None
+
+    final = min(couches[-1], key=lambda e: max(g[0] for g in e) - min(g[0] for g in e))
+    return _reconstruire(couches, final, ordre, avantages, table, nb_polarises, debuts)
+
+
+def _reconstruire(couches, final: Etat, ordre: List[int], avantages, table: TableEtudiants,
+                  nb_polarises: int, debuts: List[int]) -> List[int]:
+    # Slot chosen at each step, read backwards from the final state
+    choix, etat = [], final
+    for couche in reversed(couches[1:]):
+        etat, k = couche[etat]
+        choix.append(k)
+    choix.reverse()
+    # Replay forwards, following each real group through the sorting of states
+    initial = next(iter(couches[0]))
+    etiquetes = [(g, k) for k, g in enumerate(initial)]
+    res = [0] * len(ordre)
+    for rang, (i, k) in enumerate(zip(ordre, choix)):
+        (s, c, l, m), groupe = etiquetes[k]
+        res[i] = groupe
+        etiquetes[k] = ((s + avantages[i], c + 1, l or bool(table.leaders[i]),
+                         m | table.masque(i)), groupe)
+        if rang + 1 == nb_polarises:
+            etiquetes = [((s, c, l, 0), groupe) for (s, c, l, m), groupe in etiquetes]
+        etiquetes = list(_canonique(etiquetes, debuts))
+    return res
@@ -0,0 +1,72 @@
+"""
+Vectorised scoring of many candidate assignments at once (requires numpy).
+
+A batch is a 2-D integer array: one row per candidate, one column per student,
+each cell holding the index of the student's group. Validity and max-min spread
+of every row are computed with a handful of array operations instead of Python
+loops over GroupeProjet objects.
+"""
+from itertools import islice
+from typing import Iterable, Sequence, Tuple
+
+import numpy as np
+
+from recherche import echelle_entiere
+from table_etudiants import TableEtudiants
+
+
+class Evaluateur(object):
+    """Array views of the students' avantage, leader flag and polarity."""
+
+    def __init__(self, etudiants: Sequence, nb_groupes: int):
+        """
+        :param etudiants: the students, or their TableEtudiants
+        """
+        table = TableEtudiants.de(etudiants)
+        avantages, self.facteur = echelle_entiere(table.avantages)
+        self.avantages = np.array(avantages, dtype=np.int64)
+        self.leaders = np.frombuffer(bytes(table.leaders), dtype=np.uint8).astype(np.int64)
+        # One column per polarity: polarites[i, c] == 1 if student i has polarity code c
+        codes = np.frombuffer(table.polarites, dtype=np.int32)
+        self.polarites = (codes[:, None] == np.arange(len(table.classes))).astype(np.int64)
+        self.nb_groupes = nb_groupes
+
+    def evaluer(self, lot: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param lot: (candidates, students) array of group indices
+        :return: (validity of each row, max-min spread of each row as floats)
+        """
+        lot = np.asarray(lot)
+        # (candidates, students, groups) membership mask
+        membres = (lot[:, :, None] == np.arange(self.nb_groupes)).astype(np.int64)
+        sommes = np.einsum('cig,i->cg', membres, self.avantages)
+        avec_leader = np.einsum('cig,i->cg', membres, self.leaders).all(axis=1)
+        sans_doublon = (np.einsum('cig,ip->cgp', membres, self.polarites) <= 1).all(axis=(1, 2))
+        ecarts = (sommes.max(axis=1) - sommes.min(axis=1)) / self.facteur
+        return avec_leader & sans_doublon, ecarts
+
+    def meilleur(self, lot: np.ndarray) -> Tuple[float, int]:
+        """
+        :return: (best spread among valid rows, its row index), (inf, -1) if none is valid
+        """
+        valides, ecarts = self.evaluer(lot)
+        if not valides.any():
+            return float('inf'), -1
+        ecarts = np.where(valides, ecarts, np.inf)
+        ligne = int(ecarts.argmin())
+        return float(ecarts[ligne]), ligne
+
+
+def lots(affectations: Iterable[Sequence[int]], taille: int) -> Iterable[np.ndarray]:
+    """
+    Group assignment vectors into 2-D arrays of at most taille rows.
+
+    Each vector is copied, so the read-only views yielded by
+    BoundedPartition.assignment_vectors can be batched directly.
+    """
+    affectations = iter(affectations)
+    while True:
+        lot = [np.array(a) for a in islice(affectations, taille)]
+        if not lot:
+            return
+        yield np.stack(lot)
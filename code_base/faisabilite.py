@@ -0,0 +1,103 @@
+import heapq
+import math
+from fractions import Fraction
+from typing import List, Sequence
+
+""" Analyse d'un groupe de TD avant toute résolution.
+- Faisabilité : nombre de leaders, taille de chaque classe de polarité (au plus
+  un étudiant de chaque classe par groupe) et répartition des classes dans les
+  capacités des groupes. Chaque raison trouvée prouve qu'aucune répartition
+  valide n'existe ; l'absence de raison ne prouve pas l'inverse.
+- Borne inférieure prouvée de l'écart max - min des avantages : un solveur
+  exact peut s'arrêter dès qu'il trouve une répartition qui l'atteint.
+Les calculs sont faits en fractions exactes (avantages décimaux).
+"""
+
+
+def _exacte(v) -> Fraction:
+    # Valeur décimale telle qu'écrite (0.1 -> 1/10), sans l'erreur de représentation binaire
+    return Fraction(str(v))
+
+
+""" Plus grand pas commun des avantages : toute somme de groupe en est un multiple. """
+def granularite(valeurs: Sequence[Fraction]) -> Fraction:
+    denominateur = math.lcm(*(v.denominator for v in valeurs)) if valeurs else 1
+    return Fraction(math.gcd(*(int(v * denominateur) for v in valeurs)), denominateur)
+
+
+def _arrondi_haut(x: Fraction, pas: Fraction) -> Fraction:
+    return math.ceil(x / pas) * pas if pas else x
+
+
+def _arrondi_bas(x: Fraction, pas: Fraction) -> Fraction:
+    return math.floor(x / pas) * pas if pas else x
+
+
+""" Borne inférieure de l'écart max - min des sommes d'avantages des groupes.
+Le groupe le plus chargé dépasse la moyenne et la somme des plus petits avantages
+qu'il peut contenir ; le moins chargé reste sous la moyenne et sous la somme des
+plus grands ; les deux sont arrondis au pas commun des avantages.
+"""
+def borne_inferieure(avantages: Sequence[float], capacites: Sequence[int]) -> Fraction:
+    valeurs = sorted(_exacte(v) for v in avantages)
+    nb = len(capacites)
+    if nb < 2 or not valeurs:
+        return Fraction(0)
+    pas = granularite(valeurs)
+    moyenne = sum(valeurs) / nb
+    plus_haut = max(_arrondi_haut(moyenne, pas), sum(valeurs[:max(capacites)]))
+    plus_bas = min(_arrondi_bas(moyenne, pas), sum(valeurs[len(valeurs) - min(capacites):]))
+    return max(Fraction(0), _arrondi_haut(plus_haut - plus_bas, pas))
+
+
+""" Vrai si chaque classe de polarité peut avoir ses étudiants dans des groupes
+distincts sans dépasser les capacités : les plus grandes classes d'abord, chacune
+dans les groupes ayant le plus de places restantes.
+"""
+def classes_repartissables(tailles_classes: Sequence[int], capacites: Sequence[int]) -> bool:
+    places = [-c for c in capacites]
+    heapq.heapify(places)
+    for taille in sorted(tailles_classes, reverse=True):
+        if taille > len(places):
+            return False
+        pris = [heapq.heappop(places) for _ in range(taille)]
+        if any(p == 0 for p in pris):
+            return False
+        for p in pris:
+            heapq.heappush(places, p + 1)
+    return True
+
+
+class Analyse(object):
+    """ Raisons d'infaisabilité (vide si aucune n'est détectée) et borne inférieure de l'écart. """
+
+    def __init__(self, raisons: List[str], borne: Fraction):
+        self.raisons = raisons
+        self.borne = borne
+
+    @property
+    def faisable(self) -> bool:
+        return not self.raisons
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(faisable={self.faisable}, borne={float(self.borne)}, {self.raisons})'
+
+
+def analyser(etudiants: Sequence, capacites: Sequence[int]) -> Analyse:
+    nb = len(capacites)
+    raisons = []
+    nb_leaders = sum(1 for e in etudiants if e.leader)
+    if nb_leaders < nb:
+        raisons.append(f"Pas assez de chefs de groupe : {nb_leaders} pour {nb} groupes.")
+    if any(c <= 0 for c in capacites):
+        raisons.append("Groupe sans place : il ne peut pas recevoir de chef de groupe.")
+    classes = {}
+    for e in etudiants:
+        if e.polarite is not None:
+            classes[e.polarite] = classes.get(e.polarite, 0) + 1
+    trop_grandes = {p: c for p, c in classes.items() if c > nb}
+    if trop_grandes:
+        raisons.append(f"Polarité(s) {trop_grandes} : plus d'étudiants que de groupes.")
+    elif not classes_repartissables(list(classes.values()), capacites):
+        raisons.append("Capacités insuffisantes pour séparer les étudiants de même polarité.")
+    return Analyse(raisons, borne_inferieure([e.avantage for e in etudiants], capacites))
@@ -1,4 +1,4 @@
-from copy import deepcopy
+from array import array
 from typing import Sequence, Collection
 
 
@@ -65,15 +65,65 @@ class BoundedPartition(object):
     def assign(self, member, group_name: int):
         self.groups[group_name].add_member(member)
 
-    def possible_assignments(self, members: Sequence):
+    def possible_assignments(self, members: Sequence, canonical: bool = False):
+        """
+        Enumerate every way to place the members into the groups.
+
+        :param members: members to place
+        :param canonical: empty groups of equal capacity are interchangeable, so only
+        the first of them is tried: each partition is produced once instead of once
+        per relabelling of those groups
+        """
+        for assignment in self.assignment_vectors(members, canonical):
+            yield self.materialize(members, assignment)
+
+    def assignment_vectors(self, members: Sequence, canonical: bool = False):
+        """
+        Enumerate the same assignments as possible_assignments, without building groups.
+
+        A single preallocated array is updated in place and yielded as a read-only
+        view: item i is the index (in self.groups order) of the group receiving
+        members[i]. Copy it or pass it to materialize to keep a solution.
+        """
         if len(members) + self.member_count > self.capacity:
             raise ValueError
-        if not members:
-            yield deepcopy(self)
-        else:
-            current_member, *other_members = members
-            for g in self.groups.values():
-                if not g.is_full():
-                    g.add_member(current_member)
-                    yield from self.possible_assignments(other_members)
-                    g.pop_last()
+        groups = list(self.groups.values())
+        capacities = [g.capacity for g in groups]
+        filled = [len(g.members) for g in groups]
+        twins = [[j for j in range(k) if capacities[j] == capacities[k]] for k in range(len(groups))]
+        assignment = array('i', [-1] * len(members))
+        view = memoryview(assignment).toreadonly()
+        i = 0
+        while i >= 0:
+            if i == len(members):
+                yield view
+                i -= 1
+                continue
+            k = assignment[i]
+            if k >= 0:
+                filled[k] -= 1
+            k += 1
+            while k < len(groups) and (
+                    filled[k] == capacities[k]
+                    or canonical and not filled[k] and any(not filled[j] for j in twins[k])):
+                k += 1
+            if k < len(groups):
+                assignment[i] = k
+                filled[k] += 1
+                i += 1
+            else:
+                assignment[i] = -1
+                i -= 1
+
+    def materialize(self, members: Sequence, assignment: Sequence[int]):
+        """
+        Build a new partition where members[i] is added to the group of index assignment[i].
+
+        The groups of this partition are left untouched and members are not copied.
+        """
+        groups = list(self.groups.values())
+        added = [[] for _ in groups]
+        for m, k in zip(members, assignment):
+            added[k].append(m)
+        return type(self)(*(type(g)(name=g.name, members=g.members + new, room=g.room - len(new))
+                            for g, new in zip(groups, added)))
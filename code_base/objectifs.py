@@ -0,0 +1,249 @@
+import math
+from collections import Counter
+from typing import Callable, Dict, Optional, Sequence, Tuple, Union
+
+""" Critères à minimiser par les solveurs.
+Un Objectif ne relit jamais les membres d'un groupe : il tient pour chaque groupe
+un état (etat_vide, ajouter, retirer, tous en O(1)) dont il extrait une mesure,
+et calcule sa valeur à partir des mesures de tous les groupes.
+Pour évaluer un mouvement sans l'appliquer :
+- mesure_apres(etat, sortant, entrant) : mesure du groupe après le départ de
+  sortant et/ou l'arrivée de entrant (ajout, retrait ou échange) ;
+- contexte(mesures, *exclus) puis valeur_avec(contexte, *mesures_exclus) : valeur
+  quand seules les mesures des groupes exclus changent. Le contexte résume les
+  autres groupes ; il est calculé une fois par paire de groupes, puis chaque
+  candidat est évalué en O(1).
+minorant(mesures) est une borne inférieure de la valeur finale tant que les groupes
+ne font que recevoir des étudiants (recherche exacte) ; 0 si l'objectif n'en a pas.
+"""
+
+
+class Objectif(object):
+    nom = 'objectif'
+
+    def etat_vide(self):
+        raise NotImplementedError
+
+    def ajouter(self, etat, e):
+        raise NotImplementedError
+
+    def retirer(self, etat, e):
+        raise NotImplementedError
+
+    def mesure(self, etat):
+        raise NotImplementedError
+
+    def mesure_apres(self, etat, sortant=None, entrant=None):
+        raise NotImplementedError
+
+    def valeur(self, mesures: Sequence) -> float:
+        raise NotImplementedError
+
+    def contexte(self, mesures: Sequence, *exclus: int):
+        # Par défaut, les mesures des autres groupes : valeur_avec est alors en O(nb groupes)
+        return [m for k, m in enumerate(mesures) if k not in exclus]
+
+    def valeur_avec(self, contexte, *mesures) -> float:
+        return self.valeur(list(contexte) + list(mesures))
+
+    def minorant(self, mesures: Sequence) -> float:
+        return 0.0
+
+    def etat_de(self, membres):
+        etat = self.etat_vide()
+        for e in membres:
+            self.ajouter(etat, e)
+        return etat
+
+    """ Valeur de l'objectif pour des groupes donnés par leurs membres. """
+    def evaluer(self, groupes) -> float:
+        return self.valeur([self.mesure(self.etat_de(membres)) for membres in groupes])
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}()'
+
+
+class _SurTotal(Objectif):
+    """ Objectif calculé sur une quantité additive par groupe (avantage, leaders). """
+
+    @staticmethod
+    def quantite(e) -> float:
+        return e.avantage
+
+    def etat_vide(self):
+        return [0]
+
+    def ajouter(self, etat, e):
+        etat[0] += self.quantite(e)
+
+    def retirer(self, etat, e):
+        etat[0] -= self.quantite(e)
+
+    def mesure(self, etat):
+        return etat[0]
+
+    def mesure_apres(self, etat, sortant=None, entrant=None):
+        m = etat[0]
+        if sortant is not None:
+            m -= self.quantite(sortant)
+        if entrant is not None:
+            m += self.quantite(entrant)
+        return m
+
+
+class Ecart(_SurTotal):
+    """ Écart max - min des avantages totaux des groupes (Repartition.optimalite). """
+    nom = 'ecart'
+
+    def valeur(self, mesures: Sequence) -> float:
+        return max(mesures) - min(mesures)
+
+    def contexte(self, mesures: Sequence, *exclus: int):
+        autres = [m for k, m in enumerate(mesures) if k not in exclus]
+        return max(autres, default=-math.inf), min(autres, default=math.inf)
+
+    def valeur_avec(self, contexte, *mesures) -> float:
+        haut, bas = contexte
+        return max(haut, *mesures) - min(bas, *mesures)
+
+
+class Variance(_SurTotal):
+    """ Variance des avantages totaux des groupes. """
+    nom = 'variance'
+
+    def valeur(self, mesures: Sequence) -> float:
+        moyenne = sum(mesures) / len(mesures)
+        return sum((m - moyenne) ** 2 for m in mesures) / len(mesures)
+
+    def contexte(self, mesures: Sequence, *exclus: int):
+        autres = [m for k, m in enumerate(mesures) if k not in exclus]
+        return sum(autres), sum(m * m for m in autres), len(mesures)
+
+    def valeur_avec(self, contexte, *mesures) -> float:
+        somme, carres, nb = contexte
+        somme += sum(mesures)
+        carres += sum(m * m for m in mesures)
+        return max(0.0, carres / nb - (somme / nb) ** 2)
+
+
+class EquilibreLeaders(Ecart):
+    """ Écart max - min du nombre de leaders des groupes. """
+    nom = 'leaders'
+
+    @staticmethod
+    def quantite(e) -> float:
+        return 1 if e.leader else 0
+
+
+class SeparationsSouples(Objectif):
+    """
+    Pénalité des étudiants de même étiquette réunis dans un groupe : poids de
+    l'étiquette pour chaque paire. etiquette(e) donne l'étiquette d'un étudiant
+    (None : aucune) ; poids est un nombre ou un dict {étiquette: poids}.
+    """
+    nom = 'separations'
+
+    def __init__(self, etiquette: Callable, poids: Union[float, Dict] = 1.0):
+        self.etiquette = etiquette
+        self.poids = poids
+
+    def _poids(self, etiquette) -> float:
+        return self.poids.get(etiquette, 0.0) if isinstance(self.poids, dict) else self.poids
+
+    # État : [pénalité, Counter des étiquettes]
+    def etat_vide(self):
+        return [0.0, Counter()]
+
+    def ajouter(self, etat, e):
+        t = self.etiquette(e)
+        if t is not None:
+            etat[0] += self._poids(t) * etat[1][t]
+            etat[1][t] += 1
+
+    def retirer(self, etat, e):
+        t = self.etiquette(e)
+        if t is not None:
+            etat[1][t] -= 1
+            etat[0] -= self._poids(t) * etat[1][t]
+
+    def mesure(self, etat):
+        return etat[0]
+
+    def mesure_apres(self, etat, sortant=None, entrant=None):
+        penalite, compte = etat
+        ts = None if sortant is None else self.etiquette(sortant)
+        if ts is not None:
+            penalite -= self._poids(ts) * (compte[ts] - 1)
+        te = None if entrant is None else self.etiquette(entrant)
+        if te is not None:
+            penalite += self._poids(te) * (compte[te] - (1 if te == ts else 0))
+        return penalite
+
+    def valeur(self, mesures: Sequence) -> float:
+        return sum(mesures)
+
+    def contexte(self, mesures: Sequence, *exclus: int):
+        return sum(m for k, m in enumerate(mesures) if k not in exclus)
+
+    def valeur_avec(self, contexte, *mesures) -> float:
+        return contexte + sum(mesures)
+
+    def minorant(self, mesures: Sequence) -> float:
+        # Une pénalité ne baisse pas quand un groupe reçoit un étudiant (poids positifs)
+        return sum(mesures)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({getattr(self.etiquette, "__name__", self.etiquette)}, {self.poids})'
+
+
+class Ponderee(Objectif):
+    """ Somme pondérée d'objectifs : Ponderee((1, Ecart()), (0.5, SeparationsSouples(...))). """
+
+    def __init__(self, *termes: Tuple[float, Objectif]):
+        self.termes = list(termes)
+        self.nom = '+'.join(f'{poids}*{o.nom}' for poids, o in self.termes)
+
+    def etat_vide(self):
+        return [o.etat_vide() for _, o in self.termes]
+
+    def ajouter(self, etat, e):
+        for (_, o), etat_o in zip(self.termes, etat):
+            o.ajouter(etat_o, e)
+
+    def retirer(self, etat, e):
+        for (_, o), etat_o in zip(self.termes, etat):
+            o.retirer(etat_o, e)
+
+    def mesure(self, etat):
+        return tuple(o.mesure(etat_o) for (_, o), etat_o in zip(self.termes, etat))
+
+    def mesure_apres(self, etat, sortant=None, entrant=None):
+        return tuple(o.mesure_apres(etat_o, sortant, entrant) for (_, o), etat_o in zip(self.termes, etat))
+
+    def valeur(self, mesures: Sequence) -> float:
+        return sum(poids * o.valeur([m[j] for m in mesures]) for j, (poids, o) in enumerate(self.termes))
+
+    def contexte(self, mesures: Sequence, *exclus: int):
+        return tuple(o.contexte([m[j] for m in mesures], *exclus) for j, (_, o) in enumerate(self.termes))
+
+    def valeur_avec(self, contexte, *mesures) -> float:
+        return sum(poids * o.valeur_avec(contexte[j], *(m[j] for m in mesures))
+                   for j, (poids, o) in enumerate(self.termes))
+
+    def minorant(self, mesures: Sequence) -> float:
+        return sum(poids * o.minorant([m[j] for m in mesures]) for j, (poids, o) in enumerate(self.termes))
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({", ".join(f"({p}, {o!r})" for p, o in self.termes)})'
+
+
+OBJECTIFS = {'ecart': Ecart, 'variance': Variance, 'leaders': EquilibreLeaders}
+
+
+""" Objectif désigné par son nom (ligne de commande) ; None pour l'écart par défaut. """
+def par_nom(nom: Optional[str]) -> Optional[Objectif]:
+    if nom is None:
+        return None
+    if nom not in OBJECTIFS:
+        raise ValueError(f"Objectif inconnu : {nom} (connus : {', '.join(OBJECTIFS)})")
+    return OBJECTIFS[nom]()
@@ -0,0 +1,78 @@
+"""
+Parallel branch and bound.
+
+The search tree is split on the assignments of the first students; each subtree
+is explored by a worker process. Workers share the best score found so far and
+prune against it, and the subtrees' results are merged in exploration order, so
+the returned assignment is the one the sequential search would return.
+"""
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from recherche import RechercheExacte
+
+_recherche: Optional[RechercheExacte] = None
+
+
+def _initialiser(etudiants: Sequence, capacites: Sequence[int], partage, nb_taches: int,
+                 echeance: Optional[float], budget_noeuds: Optional[int]):
+    global _recherche
+    _recherche = RechercheExacte(etudiants, capacites, verbeux=False)
+    _recherche.partage = partage
+    _recherche.nb_taches = nb_taches
+    _recherche.echeance = echeance
+    _recherche.max_noeuds = budget_noeuds
+
+
+def _sous_arbre(tache: int, prefixe: tuple):
+    score, affectation = _recherche.sous_arbre(prefixe, tache)
+    return score, affectation, _recherche.complet, effort(_recherche)
+
+
+def effort(recherche: RechercheExacte) -> Dict[str, int]:
+    """Search effort counters of a RechercheExacte."""
+    return {'noeuds': recherche.noeuds, 'feuilles': recherche.feuilles,
+            'bornes': recherche.bornes, 'ameliorations': recherche.ameliorations}
+
+
+def decouper(recherche: RechercheExacte, nb_taches: int) -> List[tuple]:
+    """Shallowest list of prefixes giving at least nb_taches subtrees (or the whole tree)."""
+    prefixes = [()]
+    for profondeur in range(1, len(recherche.ordre) + 1):
+        if not prefixes or len(prefixes) >= nb_taches:
+            break
+        prefixes = list(recherche.prefixes(profondeur))
+    return prefixes
+
+
+def explorer_en_parallele(etudiants: Sequence, capacites: Sequence[int], workers: int,
+                          budget_s: Optional[float] = None, budget_noeuds: Optional[int] = None,
+                          taches_par_worker: int = 8) -> Tuple[Optional[List[int]], bool, Dict[str, int]]:
+    """
+    Same result as RechercheExacte(etudiants, capacites).explorer(), on several processes.
+
+    :param budget_s: wall-clock budget shared by all the workers
+    :param budget_noeuds: node budget of each subtree
+    :return: (assignment, True if every subtree was fully explored, effort summed over the subtrees)
+    """
+    recherche = RechercheExacte(etudiants, capacites)
+    prefixes = decouper(recherche, workers * taches_par_worker)
+    partage = multiprocessing.Value('d', math.inf)
+    echeance = None if budget_s is None else time.time() + budget_s
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initialiser,
+                             initargs=(etudiants, capacites, partage, len(prefixes),
+                                       echeance, budget_noeuds)) as pool:
+        resultats = list(pool.map(_sous_arbre, range(len(prefixes)), prefixes))
+    meilleur_score, meilleure = math.inf, None
+    total = dict.fromkeys(effort(recherche), 0)
+    for score, affectation, _, compteurs in resultats:
+        if score < meilleur_score:
+            meilleur_score, meilleure = score, affectation
+        for nom, valeur in compteurs.items():
+            total[nom] += valeur
+    if meilleure is not None:
+        print('Nouvel optimal: ', meilleur_score / recherche.facteur)
+    return recherche.en_ordre_initial(meilleure), all(r[2] for r in resultats), total
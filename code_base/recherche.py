@@ -0,0 +1,533 @@
+"""
+Exact search of the best partition by branch and bound.
+
+The students are placed one at a time into groups of fixed capacity. A partial
+assignment is abandoned as soon as:
+- two students sharing a polarity end up in the same group,
+- a group can no longer receive a leader,
+- the smallest max-min spread it can still reach is no better than the best
+  complete assignment found so far.
+Empty groups of equal capacity are interchangeable, so each partition is explored
+once rather than once per relabelling of those groups. Each student tries the
+least loaded groups first, and the search starts from a valid greedy assignment
+(glouton_valide): a search cut by its budget never returns worse than the greedy.
+The search stops as soon as an assignment meets the lower bound of
+faisabilite.borne_inferieure.
+
+With k > 1, the k best distinct partitions are kept in a bounded heap and
+branches are pruned against the k-th best score instead of the best one.
+RechercheObjectif explores the same tree for another objective (objectifs.py).
+"""
+import heapq
+import math
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from faisabilite import borne_inferieure
+from table_etudiants import TableEtudiants
+
+
+def echelle_entiere(valeurs: Sequence[float], max_decimales: int = 6) -> Tuple[List[int], int]:
+    """
+    Convert decimal values into integers sharing a common scale factor.
+
+    Sums and comparisons are then exact, without float rounding drift.
+    :return: (integer values, factor) with valeurs[i] == entiers[i] / factor
+    """
+    for d in range(max_decimales + 1):
+        facteur = 10 ** d
+        entiers = [round(v * facteur) for v in valeurs]
+        if all(abs(e - v * facteur) < 1e-6 for e, v in zip(entiers, valeurs)):
+            return entiers, facteur
+    raise ValueError(f'More than {max_decimales} decimals in {valeurs}')
+
+
+def sommes_extremes(valeurs: Sequence[int]) -> Tuple[List[int], List[int]]:
+    """Sums of the r smallest and of the r largest values, for every r."""
+    croissant = sorted(valeurs)
+    bas, hauts = [0], [0]
+    for v in croissant:
+        bas.append(bas[-1] + v)
+    for v in reversed(croissant):
+        hauts.append(hauts[-1] + v)
+    return bas, hauts
+
+
+def glouton_valide(avantages: Sequence[int], leaders: Sequence[bool], bits: Sequence[int],
+                   capacites: Sequence[int]) -> Optional[List[int]]:
+    """
+    Quick valid assignment of the students, taken in the given order.
+
+    Each student goes to the least loaded group that can take them without a
+    polarity clash, a leader going first to a group that has none yet; a group
+    is only filled up once it has a leader.
+    :return: the group index of each student, or None if the greedy gets stuck
+    """
+    nb = len(capacites)
+    leaders_restants = [0] * (len(avantages) + 1)
+    for rang in range(len(avantages) - 1, -1, -1):
+        leaders_restants[rang] = leaders_restants[rang + 1] + bool(leaders[rang])
+    sommes, tailles = [0] * nb, [0] * nb
+    avec_leader, masques = [False] * nb, [0] * nb
+    affectation = [0] * len(avantages)
+    for rang, (avantage, leader, bit) in enumerate(zip(avantages, leaders, bits)):
+        possibles = [k for k in range(nb)
+                     if tailles[k] < capacites[k] and not masques[k] & bit
+                     and (avec_leader[k] or leader or tailles[k] + 1 < capacites[k])]
+        if not possibles:
+            return None
+        k = min(possibles, key=lambda k: (avec_leader[k] or not leader, sommes[k]))
+        affectation[rang] = k
+        sommes[k] += avantage
+        tailles[k] += 1
+        avec_leader[k] = avec_leader[k] or bool(leader)
+        masques[k] |= bit
+        if sum(not l for l in avec_leader) > leaders_restants[rang + 1]:
+            return None
+    return affectation
+
+
+class BudgetEpuise(Exception):
+    """Raised inside a search when its time or node budget is exhausted."""
+
+
+class OptimumAtteint(Exception):
+    """Raised inside a search when the incumbent meets the proven lower bound."""
+
+
+class RechercheExacte(object):
+    """
+    Branch and bound over the assignments of students to groups.
+
+    Students are explored leaders first, then polarised students, each block by
+    descending avantage: constraints bite early and good incumbents show up fast.
+    """
+
+    def __init__(self, etudiants: Sequence, capacites: Sequence[int], verbeux: bool = True, k: int = 1):
+        """
+        :param etudiants: the students, or their TableEtudiants
+        :param k: number of best partitions to keep (see solutions())
+        """
+        if k < 1:
+            raise ValueError(f'k must be at least 1, got {k}')
+        if len(etudiants) != sum(capacites):
+            raise ValueError
+        table = TableEtudiants.de(etudiants)
+        self.capacites = list(capacites)
+        avantages, self.facteur = self.echelle(table.avantages)
+        self.ordre = sorted(range(len(table)),
+                            key=lambda i: (not table.leaders[i], table.polarites[i] < 0, -avantages[i]))
+        self.avantages = [avantages[i] for i in self.ordre]
+        self.leaders = [bool(table.leaders[i]) for i in self.ordre]
+        # Polarity of each student as a bit; the polarities of a group form an int mask
+        self.bits = [table.masque(i) for i in self.ordre]
+        # Starting incumbent, in exploration order (None if the greedy fails)
+        self.gloutonne = glouton_valide(self.avantages, self.leaders, self.bits, self.capacites)
+
+        # Bounds on what the students left after depth i can bring to a group
+        n = len(self.ordre)
+        self.bas, self.hauts, self.leaders_restants = [], [], []
+        for i in range(n + 1):
+            bas, hauts = sommes_extremes(self.avantages[i:])
+            self.bas.append(bas)
+            self.hauts.append(hauts)
+            self.leaders_restants.append(sum(self.leaders[i:]))
+        total, nb = sum(self.avantages), len(self.capacites)
+        self.plancher_moyenne = total // nb
+        self.plafond_moyenne = -(-total // nb)
+        # No assignment can beat this spread: the search stops once it is reached
+        self.borne_inf = math.ceil(borne_inferieure(table.avantages, self.capacites) * self.facteur)
+
+        self.verbeux = verbeux
+        self.k = k
+        # Search effort: nodes visited, complete assignments scored, bounds computed
+        # and improvements of the incumbent
+        self.noeuds = 0
+        self.feuilles = 0
+        self.bornes = 0
+        self.ameliorations = 0
+        # Best key shared between processes (multiprocessing.Value), see parallele.py
+        self.partage = None
+        self.nb_taches = 1
+        # Budget: wall-clock deadline (time.time()) and nodes per subtree
+        self.echeance = None
+        self.max_noeuds = None
+        self.complet = True
+
+    def limiter(self, budget_s: Optional[float] = None, budget_noeuds: Optional[int] = None):
+        """Stop the search after budget_s seconds or budget_noeuds nodes (checked every 256 nodes)."""
+        self.echeance = None if budget_s is None else time.time() + budget_s
+        self.max_noeuds = budget_noeuds
+
+    def _reinitialiser(self):
+        nb = len(self.capacites)
+        self.sommes = [0] * nb
+        self.places = list(self.capacites)
+        self.nb_leaders = [0] * nb
+        self.masques = [0] * nb
+        self.sans_leader = nb
+        self.affectation = [0] * len(self.ordre)
+        # Score to beat: the best score, or the k-th best once k partitions are kept
+        self.meilleur_score = math.inf
+        self.meilleure = None
+        # Max-heap of the kept partitions: (-score, -rank found, partition key, assignment)
+        self.gardees = []
+        self.vues = set()
+        self.noeuds = 0
+        self.feuilles = 0
+        self.bornes = 0
+        self.ameliorations = 0
+        self.complet = True
+        self.tache = 0
+        self.cle_globale = math.inf if self.partage is None else self.partage.value
+        self._amorcer()
+
+    def _amorcer(self):
+        """Start from the greedy assignment as incumbent (only when a single partition is kept)."""
+        if self.k == 1 and self.gloutonne is not None:
+            self.meilleure = list(self.gloutonne)
+            self.meilleur_score = self.score(self.gloutonne)
+
+    def echelle(self, avantages: Sequence[float]) -> Tuple[List[int], int]:
+        """Integer avantages and their common factor (see echelle_entiere); all scores use this scale."""
+        return echelle_entiere(avantages)
+
+    def score(self, affectation: Sequence[int]) -> int:
+        """Scaled max-min spread of a complete assignment given in exploration order."""
+        sommes = [0] * len(self.capacites)
+        for i, k in enumerate(affectation):
+            sommes[k] += self.avantages[i]
+        return max(sommes) - min(sommes)
+
+    def explorer(self) -> Optional[List[int]]:
+        """
+        :return: the group index of each student (in the original order) for an
+        optimal valid assignment, or None if no valid assignment exists.
+        If the budget ran out, complet is False and the result is the best
+        assignment found so far (None if none was found).
+        """
+        _, meilleure = self.sous_arbre(())
+        return self.en_ordre_initial(meilleure)
+
+    def solutions(self) -> List[Tuple[float, List[int]]]:
+        """
+        The kept partitions, best first (ties in exploration order), as
+        (spread, group index of each student in the original order).
+        With k == 1, only the best one.
+        """
+        if self.k == 1:
+            if self.meilleure is None:
+                return []
+            return [(self.meilleur_score / self.facteur, self.en_ordre_initial(self.meilleure))]
+        return [(-score / self.facteur, self.en_ordre_initial(affectation))
+                for score, _, _, affectation in sorted(self.gardees, key=lambda g: (-g[0], -g[1]))]
+
+    def en_ordre_initial(self, affectation: Optional[Sequence[int]]) -> Optional[List[int]]:
+        """Reorder an assignment given in exploration order into the order of the students."""
+        if affectation is None:
+            return None
+        res = [0] * len(self.ordre)
+        for rang, i in enumerate(self.ordre):
+            res[i] = affectation[rang]
+        return res
+
+    def sous_arbre(self, prefixe: Sequence[int], tache: int = 0) -> Tuple[float, Optional[List[int]]]:
+        """
+        Explore the assignments starting with the given groups for the first students.
+
+        :param tache: rank of this subtree among the nb_taches explored in parallel
+        :return: (best score, best assignment in exploration order), (inf, None) if none
+        """
+        self._reinitialiser()
+        self.tache = tache
+        for i, k in enumerate(prefixe):
+            self._placer(i, k)
+        try:
+            self._controler()
+            if self.meilleure is not None and self.meilleur_score <= self.borne_inf:
+                raise OptimumAtteint  # the greedy incumbent is already optimal
+            self._explorer(len(prefixe))
+        except BudgetEpuise:
+            self.complet = False
+        except OptimumAtteint:
+            pass
+        if self.k > 1:
+            return min((-g[0] for g in self.gardees), default=math.inf), self.meilleure
+        return self.meilleur_score, self.meilleure
+
+    def prefixes(self, profondeur: int):
+        """Feasible assignments of the first students, in exploration order."""
+        self._reinitialiser()
+        yield from self._prefixes(0, profondeur)
+
+    def _prefixes(self, i: int, profondeur: int):
+        if i == profondeur:
+            yield tuple(self.affectation[:i])
+            return
+        for k in self._choix(i):
+            if self._placer(i, k):
+                yield from self._prefixes(i + 1, profondeur)
+            self._retirer(i, k)
+
+    def _controler(self):
+        if self.partage is not None:
+            self.cle_globale = self.partage.value
+        if self.echeance is not None and time.time() > self.echeance:
+            raise BudgetEpuise
+        if self.max_noeuds is not None and self.noeuds >= self.max_noeuds:
+            raise BudgetEpuise
+
+    def _cle(self, score: int) -> int:
+        """
+        Order (score, subtree rank) as a single number.
+
+        A subtree keeps exploring ties with a better score found in a later subtree,
+        so the parallel result is the first optimum in exploration order, as in the
+        sequential run.
+        """
+        return score * (self.nb_taches + 1) + self.tache
+
+    def _publier(self, score: int):
+        cle = self._cle(score)
+        with self.partage.get_lock():
+            if cle < self.partage.value:
+                self.partage.value = cle
+        self.cle_globale = min(self.cle_globale, cle)
+
+    def borne(self, i: int) -> int:
+        """Smallest max-min spread reachable once the students before depth i are placed."""
+        bas, hauts = self.bas[i], self.hauts[i]
+        plus_bas_max = max(s + bas[p] for s, p in zip(self.sommes, self.places))
+        plus_haut_min = min(s + hauts[p] for s, p in zip(self.sommes, self.places))
+        return (max(plus_bas_max, self.plafond_moyenne)
+                - min(plus_haut_min, self.plancher_moyenne))
+
+    def _choix(self, i: int) -> List[int]:
+        """Groups that can receive the student at depth i."""
+        bit = self.bits[i]
+        ouverts = set()
+        res = []
+        for k in range(len(self.capacites)):
+            if not self.places[k]:
+                continue
+            if self.places[k] == self.capacites[k]:
+                # Empty groups of equal capacity are interchangeable: open only the first
+                if self.capacites[k] in ouverts:
+                    continue
+                ouverts.add(self.capacites[k])
+            if bit & self.masques[k]:
+                continue
+            res.append(k)
+        # Least loaded groups first: good incumbents show up early
+        res.sort(key=self.sommes.__getitem__)
+        return res
+
+    def _placer(self, i: int, k: int) -> bool:
+        """
+        Put the student at depth i into group k.
+
+        :return: False if some group can no longer get a leader
+        """
+        self.sommes[k] += self.avantages[i]
+        self.places[k] -= 1
+        if self.leaders[i]:
+            self.nb_leaders[k] += 1
+            if self.nb_leaders[k] == 1:
+                self.sans_leader -= 1
+        self.masques[k] |= self.bits[i]
+        self.affectation[i] = k
+        return ((self.places[k] > 0 or self.nb_leaders[k] > 0)
+                and self.sans_leader <= self.leaders_restants[i + 1])
+
+    def _retirer(self, i: int, k: int):
+        self.masques[k] &= ~self.bits[i]
+        if self.leaders[i]:
+            if self.nb_leaders[k] == 1:
+                self.sans_leader += 1
+            self.nb_leaders[k] -= 1
+        self.places[k] += 1
+        self.sommes[k] -= self.avantages[i]
+
+    def _explorer(self, i: int):
+        self.noeuds += 1
+        if not self.noeuds & 255:
+            self._controler()
+        if i == len(self.ordre):
+            self.feuilles += 1
+            score = max(self.sommes) - min(self.sommes)
+            if score < self.meilleur_score:
+                self._retenir(score)
+            return
+        for k in self._choix(i):
+            if self._placer(i, k):
+                self.bornes += 1
+                borne = self.borne(i + 1)
+                if borne < self.meilleur_score and self._cle(borne) < self.cle_globale:
+                    self._explorer(i + 1)
+            self._retirer(i, k)
+
+    def _retenir(self, score: int):
+        """Keep the current complete assignment as the new incumbent (one of the kept ones if k > 1)."""
+        self.ameliorations += 1
+        if self.k > 1:
+            if not self._garder(score):
+                return
+        else:
+            self.meilleur_score = score
+        if self.verbeux:
+            print('Nouvel optimal: ', score / self.facteur)
+        self.meilleure = list(self.affectation)
+        if self.partage is not None:
+            self._publier(score)
+        if self.meilleur_score <= self.borne_inf:
+            raise OptimumAtteint
+
+    def _garder(self, score: int) -> bool:
+        """
+        Add the current assignment to the k kept partitions and raise the score to beat
+        to the k-th best once k are kept.
+
+        :return: True if it is the best partition found so far
+        """
+        nb = len(self.capacites)
+        membres = [[] for _ in range(nb)]
+        for i, k in enumerate(self.affectation):
+            membres[k].append(i)
+        # Same partition up to a relabelling of the groups, same key
+        cle = frozenset(tuple(m) for m in membres)
+        if cle in self.vues:
+            return False
+        meilleure = not self.gardees or score < min(-g[0] for g in self.gardees)
+        self.vues.add(cle)
+        heapq.heappush(self.gardees, (-score, -self.ameliorations, cle, list(self.affectation)))
+        if len(self.gardees) > self.k:
+            self.vues.discard(heapq.heappop(self.gardees)[2])
+        if len(self.gardees) == self.k:
+            self.meilleur_score = -self.gardees[0][0]
+        return meilleure
+
+
+class RechercheInstrumentee(RechercheExacte):
+    """
+    The same search, also recording into a Statistiques the pruned branches by
+    reason and the time of each incumbent improvement.
+
+    The counting lives in this subclass so that RechercheExacte's loop is unchanged
+    when no statistics are requested.
+    """
+
+    def __init__(self, etudiants: Sequence, capacites: Sequence[int], stats, verbeux: bool = True, k: int = 1):
+        super(RechercheInstrumentee, self).__init__(etudiants, capacites, verbeux, k)
+        self.stats = stats
+
+    def _choix(self, i: int) -> List[int]:
+        elagages = self.stats.elagages
+        bit = self.bits[i]
+        ouverts = set()
+        res = []
+        for k in range(len(self.capacites)):
+            if not self.places[k]:
+                elagages['capacite'] += 1
+                continue
+            if self.places[k] == self.capacites[k]:
+                if self.capacites[k] in ouverts:
+                    elagages['symetrie'] += 1
+                    continue
+                ouverts.add(self.capacites[k])
+            if bit & self.masques[k]:
+                elagages['polarite'] += 1
+                continue
+            res.append(k)
+        # Least loaded groups first: good incumbents show up early
+        res.sort(key=self.sommes.__getitem__)
+        return res
+
+    def _explorer(self, i: int):
+        self.noeuds += 1
+        if not self.noeuds & 255:
+            self._controler()
+        if i == len(self.ordre):
+            self.feuilles += 1
+            score = max(self.sommes) - min(self.sommes)
+            if score < self.meilleur_score:
+                self._retenir(score)
+            return
+        elagages = self.stats.elagages
+        for k in self._choix(i):
+            if self._placer(i, k):
+                self.bornes += 1
+                borne = self.borne(i + 1)
+                if borne < self.meilleur_score and self._cle(borne) < self.cle_globale:
+                    self._explorer(i + 1)
+                else:
+                    elagages['borne'] += 1
+            else:
+                elagages['leader'] += 1
+            self._retirer(i, k)
+
+    def _retenir(self, score: int):
+        self.stats.ameliorer(score / self.facteur)
+        super(RechercheInstrumentee, self)._retenir(score)
+
+    def _amorcer(self):
+        super(RechercheInstrumentee, self)._amorcer()
+        if self.meilleure is not None:
+            self.stats.ameliorer(self.meilleur_score / self.facteur)
+
+
+class RechercheObjectif(RechercheExacte):
+    """
+    The same tree, minimising an objectifs.Objectif instead of the spread.
+
+    Every group keeps the objective's state, updated in O(1) as students are
+    placed and removed. A branch is pruned when the objective's minorant on the
+    partial groups cannot beat the score to beat; the spread bound and its early
+    stop do not apply. Scores are objective values rather than scaled sums. The
+    objective must not depend on group labels, since interchangeable empty groups
+    are still opened only once.
+    """
+
+    def __init__(self, etudiants: Sequence, capacites: Sequence[int], objectif, verbeux: bool = True,
+                 k: int = 1):
+        super(RechercheObjectif, self).__init__(etudiants, capacites, verbeux, k)
+        table = TableEtudiants.de(etudiants)
+        self.objectif = objectif
+        self.membres = [table.etudiants[i] for i in self.ordre]
+        self.facteur = 1
+        self.borne_inf = -math.inf
+
+    def _reinitialiser(self):
+        self.etats = [self.objectif.etat_vide() for _ in self.capacites]
+        super(RechercheObjectif, self)._reinitialiser()
+
+    def score(self, affectation: Sequence[int]) -> float:
+        groupes = [[] for _ in self.capacites]
+        for i, k in enumerate(affectation):
+            groupes[k].append(self.membres[i])
+        return self.objectif.evaluer(groupes)
+
+    def _placer(self, i: int, k: int) -> bool:
+        self.objectif.ajouter(self.etats[k], self.membres[i])
+        return super(RechercheObjectif, self)._placer(i, k)
+
+    def _retirer(self, i: int, k: int):
+        self.objectif.retirer(self.etats[k], self.membres[i])
+        super(RechercheObjectif, self)._retirer(i, k)
+
+    def _explorer(self, i: int):
+        self.noeuds += 1
+        if not self.noeuds & 255:
+            self._controler()
+        objectif = self.objectif
+        if i == len(self.ordre):
+            self.feuilles += 1
+            score = objectif.valeur([objectif.mesure(etat) for etat in self.etats])
+            if score < self.meilleur_score - 1e-9:
+                self._retenir(score)
+            return
+        for k in self._choix(i):
+            if self._placer(i, k):
+                self.bornes += 1
+                if objectif.minorant([objectif.mesure(etat) for etat in self.etats]) < self.meilleur_score - 1e-9:
+                    self._explorer(i + 1)
+            self._retirer(i, k)
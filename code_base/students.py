@@ -1,10 +1,19 @@
 import math
-from typing import List, Sequence
+import time
+from collections import Counter
+from typing import Collection, Dict, List, Sequence
 
+import dynamique
+from faisabilite import analyser
+from objectifs import Ecart
 from grouping import BoundedPartition, BoundedGroup
+from parallele import effort, explorer_en_parallele
+from recherche import BudgetEpuise, RechercheExacte, RechercheInstrumentee, RechercheObjectif
+from statistiques import Statistiques
 
 
 class Etudiant(object):
+    __slots__ = ('nom', 'prenom', 'avantage', 'leader', 'polarite', 'alea')
 
     def __init__(self, nom, prenom, avantage: float, leader=False, polarite: int = None, alea: float = 0):
         self.nom = nom
@@ -21,26 +30,59 @@ class Etudiant(object):
         return self.nom <= other.nom
 
 
-def has_duplicate_numbers(li):
-    for i, n in enumerate(li):
-        if n is None:
-            continue
-        if n in li[i+1:]:
-            return True
-    return False
+class GroupeProjet(BoundedGroup):
+    """
+    Groupe de projet dont l'avantage total, le nombre de leaders et les polarités
+    sont tenus à jour par add_member / pop_last : chaque requête est en O(1).
+    Les attributs d'un étudiant ne doivent pas changer tant qu'il est membre.
+    """
 
+    def __init__(self, name=None, members: Collection = (), room: int = 0):
+        super(GroupeProjet, self).__init__(name=name, members=members, room=room)
+        self._avantage = 0
+        self._leaders = 0
+        self._polarites = Counter()
+        self._doublons = 0
+        for etu in self.members:
+            self._compter(etu, 1)
 
-class GroupeProjet(BoundedGroup):
+    def _compter(self, etu, sens: int):
+        self._avantage += sens * etu.avantage
+        if etu.leader:
+            self._leaders += sens
+        p = etu.polarite
+        if p is not None:
+            if sens > 0:
+                if self._polarites[p]:
+                    self._doublons += 1
+                self._polarites[p] += 1
+            else:
+                self._polarites[p] -= 1
+                if self._polarites[p]:
+                    self._doublons -= 1
+                else:
+                    del self._polarites[p]
+
+    def add_member(self, m):
+        super(GroupeProjet, self).add_member(m)
+        self._compter(m, 1)
+
+    def pop_last(self):
+        m = self.members[-1]
+        super(GroupeProjet, self).pop_last()
+        self._compter(m, -1)
 
     def avantage(self):
-        return sum(etu.avantage for etu in self.members)
+        return self._avantage
 
     def avec_leader(self):
-        return any(etu.leader for etu in self.members)
+        return self._leaders > 0
+
+    def contient_polarite(self, p) -> bool:
+        return self._polarites[p] > 0
 
     def incompatible(self):
-        polarites = [etu.polarite for etu in self.members if etu.polarite is not None]
-        return has_duplicate_numbers(polarites)
+        return self._doublons > 0
 
     def __repr__(self):
         return super(GroupeProjet, self).__repr__() + f'={self.avantage():.1f}'
@@ -78,19 +120,187 @@ class Repartition(BoundedPartition):
         avantages = [g.avantage() for g in self.groups.values()]
         return max(avantages) - min(avantages)
 
+    def valeur(self, objectif=None) -> float:
+        """ Valeur de l'objectif (objectifs.Objectif) ; sans objectif, l'écart optimalite(). """
+        if objectif is None:
+            return self.optimalite()
+        return objectif.evaluer([g.members for g in self.groups.values()])
+
+    @classmethod
+    def vide(cls, tailles: Sequence[int]):
+        return cls(*(GroupeProjet(name=n, room=capacite) for n, capacite in enumerate(tailles, start=1)))
+
+    @classmethod
+    def resoudre(cls, g: GroupeTP, nb: int = 3, workers: int = 1,
+                 budget_s: float = None, budget_noeuds: int = None, cache=None,
+                 stats: Statistiques = None, k: int = 1, objectif=None) -> 'Resultat':
+        """
+        Recherche exacte, interrompue au bout de budget_s secondes ou budget_noeuds nœuds :
+        le résultat est alors la meilleure répartition trouvée jusque-là.
+        Avec un cache (CacheSolutions), un optimum déjà prouvé pour les mêmes étudiants est relu.
+        Avec stats, la recherche est instrumentée (élagages par raison, instants des
+        améliorations) ; en parallèle, seuls les nœuds et feuilles sont comptés.
+        Une entrée dont l'analyse préalable (faisabilite) prouve l'infaisabilité est
+        rejetée sans recherche.
+        Avec k > 1, les k meilleures répartitions distinctes (à renumérotation des
+        groupes près) sont gardées dans Resultat.solutions ; la recherche est alors
+        séquentielle et le cache n'est pas utilisé.
+        Avec un objectif (objectifs.Objectif), c'est sa valeur qui est minimisée,
+        également en séquentiel et sans cache ; l'écart (objectifs.Ecart) garde la
+        recherche habituelle et sa borne.
+        """
+        if type(objectif) is Ecart:
+            objectif = None
+        tailles = g.repartition(nb)
+        if not analyser(g.etudiants, tailles).faisable:
+            return Resultat(None, True, {}, stats)
+        if k > 1 or objectif is not None:
+            return cls._resoudre_sequentiel(g, tailles, k, budget_s, budget_noeuds, stats, objectif)
+        if cache is not None:
+            cle = cache.empreinte(g.etudiants, 'faire', nb=nb)
+            affectation = cache.lire(cle, g.etudiants)
+            if affectation is not None:
+                return Resultat(cls.vide(tailles).materialize(g.etudiants, affectation), True)
+        if workers > 1:
+            affectation, complet, compteurs = explorer_en_parallele(g.etudiants, tailles, workers,
+                                                                    budget_s, budget_noeuds)
+        else:
+            if stats is None:
+                recherche = RechercheExacte(g.etudiants, tailles)
+            else:
+                recherche = RechercheInstrumentee(g.etudiants, tailles, stats)
+            recherche.limiter(budget_s, budget_noeuds)
+            affectation = recherche.explorer()
+            complet, compteurs = recherche.complet, effort(recherche)
+        repartition = None if affectation is None else cls.vide(tailles).materialize(g.etudiants, affectation)
+        if stats is not None:
+            stats.noeuds += compteurs['noeuds']
+            stats.feuilles += compteurs['feuilles']
+            if workers > 1 and repartition is not None:
+                stats.ameliorer(repartition.optimalite())
+        if cache is not None and complet and affectation is not None:
+            cache.ecrire(cle, g.etudiants, affectation)
+        return Resultat(repartition, complet, compteurs, stats)
+
+    @classmethod
+    def _resoudre_sequentiel(cls, g: GroupeTP, tailles: List[int], k: int, budget_s: float, budget_noeuds: int,
+                             stats: Statistiques, objectif) -> 'Resultat':
+        if objectif is not None:
+            recherche = RechercheObjectif(g.etudiants, tailles, objectif, k=k)
+        elif stats is None:
+            recherche = RechercheExacte(g.etudiants, tailles, k=k)
+        else:
+            recherche = RechercheInstrumentee(g.etudiants, tailles, stats, k=k)
+        recherche.limiter(budget_s, budget_noeuds)
+        recherche.explorer()
+        solutions = [cls.vide(tailles).materialize(g.etudiants, affectation)
+                     for _, affectation in recherche.solutions()]
+        compteurs = effort(recherche)
+        if stats is not None:
+            stats.noeuds += compteurs['noeuds']
+            stats.feuilles += compteurs['feuilles']
+        return Resultat(solutions[0] if solutions else None, recherche.complet, compteurs, stats, solutions,
+                        objectif)
+
+    @classmethod
+    def faire(cls, g: GroupeTP, nb: int = 3, workers: int = 1,
+              budget_s: float = None, budget_noeuds: int = None, cache=None, stats: Statistiques = None,
+              k: int = 1, objectif=None):
+        """
+        Groupes de la meilleure répartition ; avec k > 1, liste des groupes des k
+        meilleures répartitions distinctes, de la meilleure à la moins bonne.
+        """
+        res = cls.resoudre(g, nb, workers, budget_s, budget_noeuds, cache, stats, k, objectif)
+        if k > 1:
+            return [r.groups for r in res.solutions]
+        return res.groupes
+
     @classmethod
-    def faire(cls, g: GroupeTP, nb: int = 3):
+    def faire_par_lots(cls, g: GroupeTP, nb: int = 3, taille_lot: int = 4096, stats: Statistiques = None):
+        """
+        Énumération exhaustive dont les candidats sont évalués par lots avec numpy.
+        Avec stats, chaque candidat compte comme une feuille.
+        """
+        from evaluation import Evaluateur, lots
+
         tailles = g.repartition(nb)
-        groupes = [GroupeProjet(name=n, room=capacite) for n, capacite in enumerate(tailles, start=1)]
-        rep = cls(*groupes)
-        score_optimal = math.inf
-        groupes_optimaux = None
-        for rep_complete in rep.possible_assignments(g.etudiants):
-            if not rep_complete.validite():
-                continue
-            score = rep_complete.optimalite()
+        analyse = analyser(g.etudiants, tailles)
+        if not analyse.faisable:
+            return None
+        rep = cls.vide(tailles)
+        evaluateur = Evaluateur(g.etudiants, nb)
+        score_optimal, affectation = math.inf, None
+        for lot in lots(rep.assignment_vectors(g.etudiants, canonical=True), taille_lot):
+            if score_optimal <= analyse.borne + 1e-9:
+                break  # optimum prouvé par la borne inférieure
+            score, ligne = evaluateur.meilleur(lot)
+            if stats is not None:
+                stats.feuilles += len(lot)
             if score < score_optimal:
-                print('Nouvel optimal: ', score)
-                score_optimal = score
-                groupes_optimaux = rep_complete.groups
-        return groupes_optimaux
+                score_optimal, affectation = score, lot[ligne]
+                if stats is not None:
+                    stats.ameliorer(score)
+        if affectation is None:
+            return None
+        return rep.materialize(g.etudiants, affectation).groups
+
+    @classmethod
+    def resoudre_dp(cls, g: GroupeTP, nb: int = 3, budget_s: float = None) -> 'Resultat':
+        """
+        Programmation dynamique (dynamique.py). Au-delà de budget_s secondes, le
+        résultat est la répartition gloutonne valide qui borne la recherche (non optimale).
+        """
+        tailles = g.repartition(nb)
+        if not analyser(g.etudiants, tailles).faisable:
+            return Resultat(None, True)
+        echeance = None if budget_s is None else time.time() + budget_s
+        try:
+            affectation = dynamique.resoudre(g.etudiants, tailles, echeance)
+        except BudgetEpuise as budget:
+            # Meilleure répartition connue : celle du glouton qui borne la programmation dynamique
+            gloutonne = budget.args[0]
+            if gloutonne is None:
+                return Resultat(None, False)
+            return Resultat(cls.vide(tailles).materialize(g.etudiants, gloutonne), False)
+        if affectation is None:
+            return Resultat(None, True)
+        return Resultat(cls.vide(tailles).materialize(g.etudiants, affectation), True)
+
+    @classmethod
+    def faire_dp(cls, g: GroupeTP, nb: int = 3, budget_s: float = None):
+        return cls.resoudre_dp(g, nb, budget_s).groupes
+
+
+class Resultat(object):
+    """
+    Issue d'une résolution : la meilleure répartition trouvée (None si aucune) et
+    optimal=True si la recherche est allée au bout, ce qui prouve son optimalité
+    (ou l'absence de répartition valide).
+    effort : compteurs de la recherche (noeuds, feuilles, bornes, ameliorations), vide si inconnus.
+    statistiques : la Statistiques remplie par la recherche, si elle en a reçu une.
+    solutions : les répartitions gardées, de la meilleure à la moins bonne (les k
+    meilleures avec resoudre(..., k=k), sinon la seule répartition trouvée).
+    objectif : l'objectif minimisé (objectifs.Objectif), None pour l'écart.
+    """
+
+    def __init__(self, repartition: Repartition = None, optimal: bool = True, effort: Dict[str, int] = None,
+                 statistiques: Statistiques = None, solutions: List[Repartition] = None, objectif=None):
+        self.repartition = repartition
+        self.optimal = optimal
+        self.effort = effort or {}
+        self.statistiques = statistiques
+        if solutions is None:
+            solutions = [] if repartition is None else [repartition]
+        self.solutions = solutions
+        self.objectif = objectif
+
+    @property
+    def groupes(self):
+        return None if self.repartition is None else self.repartition.groups
+
+    @property
+    def score(self):
+        return None if self.repartition is None else self.repartition.valeur(self.objectif)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.repartition}, optimal={self.optimal})'
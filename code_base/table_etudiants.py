@@ -0,0 +1,40 @@
+from array import array
+from typing import Sequence
+
+""" Table compacte des étudiants, en colonnes.
+Les caractéristiques lues par les solveurs sont rangées dans des tableaux
+contigus indexés par l'identifiant de l'étudiant (sa position dans la liste) :
+avantage (array 'd'), leader (bytearray) et polarité codée par un entier
+(array 'i', -1 si aucune). Les solveurs travaillent sur ces identifiants ; les
+objets Etudiant ne sont relus que pour construire et afficher le résultat.
+"""
+
+
+class TableEtudiants(object):
+    __slots__ = ('etudiants', 'avantages', 'leaders', 'polarites', 'classes')
+
+    def __init__(self, etudiants: Sequence):
+        self.etudiants = list(etudiants)
+        self.avantages = array('d', (e.avantage for e in self.etudiants))
+        self.leaders = bytearray(bool(e.leader) for e in self.etudiants)
+        # Code d'une polarité : son rang d'apparition ; classes[code] redonne la valeur
+        codes = {}
+        self.polarites = array('i', (-1 if e.polarite is None else codes.setdefault(e.polarite, len(codes))
+                                     for e in self.etudiants))
+        self.classes = list(codes)
+
+    @classmethod
+    def de(cls, etudiants) -> 'TableEtudiants':
+        """ La table des étudiants, construite seulement s'il ne s'agit pas déjà d'une table. """
+        return etudiants if isinstance(etudiants, cls) else cls(etudiants)
+
+    def __len__(self):
+        return len(self.etudiants)
+
+    def masque(self, i: int) -> int:
+        """ Bit de la polarité de l'étudiant i (0 s'il n'en a pas), pour des ensembles en entiers. """
+        code = self.polarites[i]
+        return 0 if code < 0 else 1 << code
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self)} étudiants, {len(self.classes)} polarités)'
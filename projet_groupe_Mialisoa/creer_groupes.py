@@ -1,7 +1,10 @@
-import sys
+import argparse
 import time
-from xlsx_loader import load_groups
-from glouton import creer_groupes_glouton
+from instantane import charger
+from cache_solutions import CacheSolutions
+from statistiques import Statistiques, phase, profiler
+from lot import exporter, repartir, resoudre_promo
+from objectifs import OBJECTIFS, par_nom
 
 """ Script pour créer des groupes optimisés à partir d'un fichier Excel. """
 def afficher_repartition(rep: dict, truncate_membres=None) -> None:
@@ -42,23 +45,108 @@ def afficher_repartition(rep: dict, truncate_membres=None) -> None:
     
 def main():
     # Vérifie les arguments de la ligne de commande
-    if len(sys.argv) < 2:
-        print("Usage: python3 creer_groupes.py <NomDuGroupe> (ex: 2B)")
-        return
+    parser = argparse.ArgumentParser(description="Crée des groupes de projet optimisés pour un ou plusieurs groupes de TD.")
+    parser.add_argument("groupes", nargs="*", help="Nom du ou des groupes de TD (ex: 2B)")
+    parser.add_argument("--tous", action="store_true", help="Traite tous les groupes de TD de la promotion")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus en mode lot ou du multi-départ (défaut : nombre de cœurs)")
+    parser.add_argument("--export", default=None, help="Fichier JSON où exporter les répartitions (mode lot)")
+    parser.add_argument("--ameliorer", action="store_true", help="Améliore la répartition gloutonne par recherche locale")
+    parser.add_argument("--budget", type=float, default=1.0, help="Budget (secondes) de la recherche locale")
+    parser.add_argument("--cache", nargs="?", const=".cache_solutions", default=None,
+                        help="Réutilise les répartitions déjà calculées (dossier, défaut : .cache_solutions)")
+    parser.add_argument("--voisinage", action="store_true",
+                        help="Améliore la répartition gloutonne par grand voisinage (budget : --budget) ; "
+                             "incompatible avec --objectif, --cache et --departs")
+    parser.add_argument("--departs", type=int, default=1,
+                        help="Nombre de départs du glouton (aléatoires au-delà du premier), le meilleur est gardé ; "
+                             "au-delà de 1, incompatible avec --cache et --stats")
+    parser.add_argument("--graine", type=int, default=0, help="Graine des départs aléatoires")
+    parser.add_argument("--objectif", choices=list(OBJECTIFS), default=None,
+                        help="Critère à minimiser (défaut : écart des avantages)")
+    parser.add_argument("--strict", action="store_true",
+                        help="Refuse une entrée infaisable au lieu d'ignorer la polarité")
+    parser.add_argument("--stats", action="store_true", help="Affiche les statistiques du calcul (un seul groupe)")
+    parser.add_argument("--profil", default=None, help="Profile l'exécution (cProfile) et l'enregistre dans ce fichier")
+    args = parser.parse_args()
+    if not args.groupes and not args.tous:
+        parser.error("indiquez un groupe de TD (ex: 2B) ou --tous")
+    if args.voisinage:
+        # Le grand voisinage minimise l'écart et n'est ni mis en cache ni multi-départ
+        incompatibles = [option for option, present in (("--objectif", args.objectif is not None),
+                                                        ("--cache", args.cache is not None),
+                                                        ("--departs", args.departs > 1)) if present]
+        if incompatibles:
+            parser.error(f"--voisinage est incompatible avec {', '.join(incompatibles)}")
+    elif args.departs > 1:
+        # Les départs ont lieu dans d'autres processus : ni cache ni statistiques
+        incompatibles = [option for option, present in (("--cache", args.cache is not None),
+                                                        ("--stats", args.stats)) if present]
+        if incompatibles:
+            parser.error(f"--departs est incompatible avec {', '.join(incompatibles)}")
+    if (args.tous or len(args.groupes) > 1) and args.stats:
+        parser.error("--stats ne s'applique qu'à un seul groupe de TD")
+
+    with profiler(args.profil):
+        if args.tous or len(args.groupes) > 1:
+            traiter_lot(args)
+        else:
+            traiter_groupe(args)
+
+
+""" Options de lot.repartir communes à un groupe seul et au mode lot. """
+def options(args) -> dict:
+    return dict(strict=args.strict, objectif=par_nom(args.objectif),
+                cache=CacheSolutions(args.cache) if args.cache else None,
+                voisinage=args.voisinage, departs=args.departs, graine=args.graine)
 
-    nom_groupe = sys.argv[1]
+
+def traiter_groupe(args) -> None:
+    nom_groupe = args.groupes[0]
     print(f"Création des groupes optimisés pour le groupe {nom_groupe}...\n")
+    stats = Statistiques() if args.stats else None
 
-    # Charger les données depuis le fichier Excel
-    promo = load_groups('Groupes SAÉ S3 -constitution.xlsx', 'Liste S3')
+    # Charger le seul groupe demandé (instantané si le fichier Excel n'a pas changé)
+    with phase(stats, 'chargement'):
+        promo = charger('Groupes SAÉ S3 -constitution.xlsx', 'Liste S3', groupes=nom_groupe)
     if nom_groupe not in promo:
         print(f"Groupe {nom_groupe} introuvable dans le fichier Excel.")
         return
 
     # Créer les groupes optimisés
-    rep = creer_groupes_glouton(promo[nom_groupe], nb_groupes=3)
+    with phase(stats, 'resolution'):
+        rep = repartir(promo[nom_groupe], nb_groupes=3, amelioration=args.ameliorer, budget_s=args.budget,
+                       workers=args.workers, stats=stats, **options(args))
     # Afficher la répartition des groupes
-    afficher_repartition(rep)
+    with phase(stats, 'affichage'):
+        afficher_repartition(rep)
+    if stats is not None:
+        print()
+        print(stats.rapport())
+
+
+def traiter_lot(args) -> None:
+    # Une seule lecture du fichier Excel pour tous les groupes demandés
+    promo = charger('Groupes SAÉ S3 -constitution.xlsx', 'Liste S3',
+                    groupes=None if args.tous else args.groupes)
+    introuvables = [nom for nom in args.groupes if nom not in promo]
+    if introuvables:
+        print(f"Groupe(s) {introuvables} introuvable(s) dans le fichier Excel.")
+
+    resultats = resoudre_promo(promo, nb_groupes=3, workers=args.workers,
+                               amelioration=args.ameliorer, budget_s=args.budget, options=options(args))
+    for r in resultats:
+        print(f"\n=== Groupe {r.nom} ({r.duree_s:.3f} s) ===")
+        print(r.messages, end="")
+        afficher_repartition(r.groupes)
+
+    print(f"\n| Groupe | Score ({args.objectif or 'ecart'}) | Valide | Temps (s)")
+    for r in resultats:
+        score = "-" if r.score() is None else f"{r.score():.2f}"
+        valide = "-" if r.valide() is None else ("oui" if r.valide() else "non")
+        print(f"| {r.nom} | {score} | {valide} | {r.duree_s:.3f}")
+    if args.export:
+        exporter(resultats, args.export)
+        print(f"Répartitions exportées dans {args.export}")
     
 
 if __name__ == '__main__':
@@ -1,10 +1,44 @@
+import heapq
+import random
 from collections import Counter 
+from typing import Optional, Union
+from faisabilite import analyser
 from models import GroupeTP, GroupeProjet, Repartition
+from recherche_locale import ameliorer, violations
+from statistiques import Statistiques
 
 """ Algorithme glouton pour créer des groupes optimisés. 
 Retourne {} si le nombre de leaders < nb_groupes (aucune répartition effectuée).
+Les groupes non pleins sont dans une file de priorité (tas) ordonnée par avantage :
+placer un étudiant coûte O(log nb_groupes), plus un accès par groupe sauté parce
+qu'il contient déjà sa polarité.
+Avec amelioration=True, la répartition gloutonne est ensuite améliorée par
+recherche locale (échanges / déplacements) pendant au plus budget_s secondes.
+Avec un cache (CacheSolutions), une répartition déjà calculée pour les mêmes
+étudiants et paramètres est relue au lieu d'être recalculée.
+Si compteurs (dict) est fourni, il reçoit l'effort de calcul : étudiants placés,
+groupes candidats évalués et mouvements de la recherche locale.
+Avec stats (Statistiques), chaque placement compte comme un nœud, les groupes
+refusés sont comptés par raison (capacité, polarité) et la répartition gloutonne
+puis chaque mouvement de la recherche locale comme des améliorations.
+Avec strict=True, une entrée dont l'analyse de faisabilité (faisabilite.analyser)
+prouve qu'aucune répartition valide n'existe est refusée : les raisons sont
+affichées et {} est retourné, au lieu d'une répartition ignorant la polarité.
+La recherche locale corrige d'abord une répartition gloutonne invalide (voir
+recherche_locale) et s'arrête dès que la borne inférieure de l'écart est atteinte.
+Avec une graine, le passage est aléatoire et reproductible : pour l'ordre de
+placement, l'avantage de chaque étudiant est perturbé de bruit * (tirage - 0.5)
+fois l'étendue des avantages, avec un tirage dans [0, 1) propre au passage (les
+étudiants ne sont pas modifiés), et les égalités entre groupes sont départagées
+dans un ordre tiré au hasard (voir multi_depart).
+Avec un objectif (objectifs.Objectif), chaque étudiant va dans le groupe qui
+minimise la valeur de l'objectif après son ajout, et la recherche locale minimise
+cette valeur ; elle est affichée avec le score d'équilibre.
 """
-def creer_groupes_glouton(g: GroupeTP, nb_groupes: int):
+def creer_groupes_glouton(g: GroupeTP, nb_groupes: int, amelioration: bool = False, budget_s: float = 1.0,
+                          cache=None, compteurs: Optional[dict] = None, stats: Optional[Statistiques] = None,
+                          strict: bool = False, graine: Union[int, str, None] = None, bruit: float = 0.1,
+                          objectif=None):
     # --- Pré-vérification du nombre de chefs de groupe ---
     nb_leaders = sum(1 for e in g.etudiants if getattr(e, "leader", False))
     if nb_leaders < nb_groupes:
@@ -14,35 +48,104 @@ def creer_groupes_glouton(g: GroupeTP, nb_groupes: int):
 
     # Construction des groupes uniquement si faisable
     tailles = g.repartition(nb_groupes)
+    analyse = analyser(g.etudiants, tailles)
+    if strict and not analyse.faisable:
+        for raison in analyse.raisons:
+            print(raison)
+        print("Aucune répartition effectuée.")
+        return {}
     groupes = [GroupeProjet(name=n, room=capacite) for n, capacite in enumerate(tailles, start=1)]
     rep = Repartition(*groupes)
+
+    # Répartition déjà calculée ?
+    if cache is not None:
+        parametres = {} if graine is None else {'graine': graine, 'bruit': bruit}
+        if objectif is not None:
+            parametres['objectif'] = repr(objectif)
+        cle = cache.empreinte(g.etudiants, 'glouton', nb_groupes=nb_groupes,
+                              amelioration=amelioration, budget_s=budget_s, **parametres)
+        affectation = cache.lire(cle, g.etudiants)
+        if affectation is not None:
+            for e, k in zip(g.etudiants, affectation):
+                groupes[k].add_member(e)
+            print("Répartition relue depuis le cache")
+            print(f"\nScore d'équilibre final : {rep.optimalite():.2f}\n")
+            return rep.groups
     
-    """ Place les étudiants dans les groupes en respectant les contraintes. """
-    def candidat_ok(gr, e) -> bool:
-        if gr.is_full():
-            return False
-        p = getattr(e, "polarite", None)
-        if p is None:
-            return True
-        # refuse si la polarité p est déjà dans le groupe
-        pols = [etu.polarite for etu in gr.members if etu.polarite is not None]
-        return p not in pols
-    
-    """ Place un étudiant e dans un groupe selon les critères définis. """
+    effort = {'placements': 0, 'candidats': 0, 'mouvements': 0}
+
+    # File de priorité des groupes non pleins, clé (avantage, rang) : le rang
+    # départage les égalités comme min() sur les groupes dans l'ordre. Chaque
+    # clé est celle du groupe au moment où il est remis dans la file.
+    rangs = list(range(len(groupes)))
+    if graine is not None:
+        aleatoire = random.Random(graine)
+        aleatoire.shuffle(rangs)
+        tirages = {id(e): aleatoire.random() for e in g.etudiants}
+    file = [(gr.avantage(), rangs[k], gr) for k, gr in enumerate(groupes) if not gr.is_full()]
+    heapq.heapify(file)
+
+    """ Place un étudiant e dans le groupe de plus faible avantage qui n'a pas sa polarité. """
     def place(e):
-        # 1) groupes qui respectent la polarité et la capacité
-        candidats = [gr for gr in rep.groups.values() if candidat_ok(gr, e)]
-        if not candidats:
-            # 2) dernier recours : ignorer la polarité si c'est impossible (ex: > nb_groupes pour une même polarité)
-            candidats = [gr for gr in rep.groups.values() if not gr.is_full()]
-            if not candidats:
-                raise RuntimeError("Tous les groupes sont pleins, impossible de placer d'autres étudiants.")
-        # équilibre: on choisit le groupe au plus faible avantage
-        cible = min(candidats, key=lambda gr: gr.avantage())
+        effort['placements'] += 1
+        if stats is not None:
+            pleins = len(groupes) - len(file)
+            stats.noeuds += 1
+            stats.elagages['capacite'] += pleins
+        p = getattr(e, "polarite", None)
+        # Groupes sautés car ils ont déjà la polarité p, remis dans la file ensuite
+        ecartes = []
+        while file and p is not None and file[0][2].contient_polarite(p):
+            ecartes.append(heapq.heappop(file))
+        effort['candidats'] += len(ecartes) + 1
+        if stats is not None:
+            stats.elagages['polarite'] += len(ecartes)
+        if file:
+            _, k, cible = heapq.heappop(file)
+        elif ecartes:
+            # dernier recours : ignorer la polarité si c'est impossible (ex: > nb_groupes pour une même polarité)
+            _, k, cible = ecartes.pop(0)
+        else:
+            raise RuntimeError("Tous les groupes sont pleins, impossible de placer d'autres étudiants.")
         cible.add_member(e)
+        if not cible.is_full():
+            heapq.heappush(file, (cible.avantage(), k, cible))
+        for entree in ecartes:
+            heapq.heappush(file, entree)
+
+    etats = None if objectif is None else [objectif.etat_vide() for _ in groupes]
+
+    """ Place e dans le groupe sans sa polarité qui minimise l'objectif après l'ajout. """
+    def place_selon_objectif(e):
+        effort['placements'] += 1
+        effort['candidats'] += len(groupes)
+        libres = [k for k, gr in enumerate(groupes) if not gr.is_full()]
+        if not libres:
+            raise RuntimeError("Tous les groupes sont pleins, impossible de placer d'autres étudiants.")
+        p = getattr(e, "polarite", None)
+        candidats = [k for k in libres if p is None or not groupes[k].contient_polarite(p)]
+        if stats is not None:
+            stats.noeuds += 1
+            stats.elagages['capacite'] += len(groupes) - len(libres)
+            stats.elagages['polarite'] += len(libres) - len(candidats)
+        # dernier recours : ignorer la polarité, comme place()
+        candidats = candidats or libres
+        mesures = [objectif.mesure(etat) for etat in etats]
+        k = min(candidats, key=lambda k: (objectif.valeur_avec(objectif.contexte(mesures, k),
+                                                               objectif.mesure_apres(etats[k], entrant=e)),
+                                          groupes[k].avantage(), rangs[k]))
+        groupes[k].add_member(e)
+        objectif.ajouter(etats[k], e)
+
+    placer = place if objectif is None else place_selon_objectif
 
     # Trier les étudiants par avantage décroissant
-    etudiants = sorted(g.etudiants, key=lambda e: e.avantage, reverse=True)
+    if graine is None:
+        etudiants = sorted(g.etudiants, key=lambda e: e.avantage, reverse=True)
+    else:
+        etendue = max(e.avantage for e in g.etudiants) - min(e.avantage for e in g.etudiants)
+        etudiants = sorted(g.etudiants, key=lambda e: e.avantage + bruit * etendue * (tirages[id(e)] - 0.5),
+                           reverse=True)
     # Séparer les leaders et non-leaders
     leaders = [e for e in etudiants if getattr(e, "leader", False)]
     non_leaders = [e for e in etudiants if not getattr(e, "leader", False)]
@@ -50,18 +153,14 @@ def creer_groupes_glouton(g: GroupeTP, nb_groupes: int):
     # Placement des étudiants (faisable garanti par la pré-vérification)
     # 1) d'abord les leaders
     for e in leaders:
-        place(e)
+        placer(e)
 
     # 2) puis les non-leaders
     for e in non_leaders:
-        place(e)
+        placer(e)
 
     # -----Vérifications -----
-    doublons = []
-    for gid, gr in rep.groups.items():
-        pols = [e.polarite for e in gr.members if e.polarite is not None]
-        if len(pols) != len(set(pols)):
-            doublons.append(gid)
+    doublons = [gid for gid, gr in rep.groups.items() if gr.incompatible()]
     if doublons:
         print(f"Doublon(s) de polarité dans les groupes: {doublons}")
     
@@ -70,8 +169,38 @@ def creer_groupes_glouton(g: GroupeTP, nb_groupes: int):
     if impossibles:
         print(f"Contrainte impossible pour polarité(s) {impossibles} (plus d'étudiants que de groupes).")
         
+    if stats is not None:
+        stats.feuilles += 1
+        stats.ameliorer(rep.valeur(objectif))
+
+    # Amélioration optionnelle par recherche locale
+    if amelioration:
+        nb_mouvements = ameliorer(rep, budget_s, stats=stats, cible=float(analyse.borne), objectif=objectif)
+        effort['mouvements'] = nb_mouvements
+        print(f"Recherche locale : {nb_mouvements} mouvement(s) appliqué(s)")
+    if compteurs is not None:
+        compteurs.update(effort)
+
     # Calcul et affichage du score d'équilibre 
-    score = rep.optimalite() 
-    print(f"\nScore d'équilibre final : {score:.2f}\n")
+    afficher_score(rep, "Score d'équilibre final")
+    if objectif is not None:
+        print(f"Valeur de l'objectif {objectif.nom} : {rep.valeur(objectif):.4f}\n")
+
+    if cache is not None:
+        indices = {id(gr): k for k, gr in enumerate(groupes)}
+        position = {id(e): indices[id(gr)] for gr in groupes for e in gr.members}
+        cache.ecrire(cle, g.etudiants, [position[id(e)] for e in g.etudiants])
     
     return rep.groups
+
+
+""" Affiche le score d'équilibre de rep ; une répartition invalide est signalée
+avec le nombre de contraintes violées, son écart n'étant pas comparable.
+"""
+def afficher_score(rep: Repartition, libelle: str) -> None:
+    nb_violations = violations(list(rep.groups.values()))
+    if nb_violations:
+        print(f"\n{libelle} : {rep.optimalite():.2f} (répartition invalide, "
+              f"{nb_violations} contrainte(s) violée(s) : écart non comparable)\n")
+    else:
+        print(f"\n{libelle} : {rep.optimalite():.2f}\n")
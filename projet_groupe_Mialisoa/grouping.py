@@ -36,7 +36,13 @@ class BoundedGroup(object):
     def add_member(self, m):
         if self.is_full():
             raise ValueError(f'Group {self.name} is full')
-        self.members.append(m)  
+        self.members.append(m)
+
+    def pop_last(self):
+        self.members.pop()
+
+    def remove_member(self, m):
+        self.members.remove(m)
 
 
 class BoundedPartition(object):
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import pickle
+from array import array
+from pathlib import Path
+from typing import Dict, Optional
+
+from models import Etudiant, GroupeTP
+from xlsx_loader import noms_groupes, lire_etudiants
+
+""" Instantané binaire de la promotion lue dans le classeur Excel.
+Les colonnes utiles (nom, prénom, groupe, avantage, leader, polarité) sont
+enregistrées sur disque sous forme de tableaux. Tant que le classeur ne change
+pas (même chemin, taille, date de modification ou contenu), les exécutions
+suivantes relisent l'instantané sans importer openpyxl ni analyser le classeur.
+"""
+
+# À incrémenter si le format de l'instantané change
+VERSION = 1
+
+
+""" Empreinte SHA-256 du contenu d'un fichier. """
+def empreinte(filename) -> str:
+    h = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for bloc in iter(lambda: f.read(1 << 16), b''):
+            h.update(bloc)
+    return h.hexdigest()
+
+
+""" Fichier d'instantané associé à un classeur et une feuille. """
+def chemin_instantane(filename, sheet, dossier=None) -> Path:
+    source = Path(filename).resolve()
+    dossier = Path(dossier) if dossier is not None else source.parent / '.instantanes'
+    cle = hashlib.sha1(f'{source}\0{sheet}'.encode('utf-8')).hexdigest()[:16]
+    return dossier / f'{cle}.pickle'
+
+
+""" Lit le classeur (openpyxl) et le convertit en colonnes. """
+def construire(filename, sheet) -> Dict:
+    colonnes = {'nom': [], 'prenom': [], 'groupe': [], 'avantage': array('d'),
+                'leader': bytearray(), 'polarite': []}
+    for nom_groupe, e in lire_etudiants(filename, sheet):
+        colonnes['nom'].append(e.nom)
+        colonnes['prenom'].append(e.prenom)
+        colonnes['groupe'].append(nom_groupe)
+        colonnes['avantage'].append(e.avantage)
+        colonnes['leader'].append(e.leader)
+        colonnes['polarite'].append(e.polarite)
+    colonnes['leader'] = bytes(colonnes['leader'])
+    return colonnes
+
+
+""" Reconstruit les groupes demandés à partir des colonnes. """
+def groupes_depuis_colonnes(colonnes: Dict, groupes=None) -> Dict:
+    noms = noms_groupes(groupes)
+    res = {}
+    for i, nom_groupe in enumerate(colonnes['groupe']):
+        if noms is not None and nom_groupe not in noms:
+            continue
+        groupe = res.setdefault(nom_groupe, GroupeTP(nom_groupe, etudiants=()))
+        groupe.etudiants.append(Etudiant(nom=colonnes['nom'][i],
+                                         prenom=colonnes['prenom'][i],
+                                         avantage=colonnes['avantage'][i],
+                                         leader=bool(colonnes['leader'][i]),
+                                         polarite=colonnes['polarite'][i]))
+    return res
+
+
+""" Relit l'instantané s'il correspond au classeur, sinon None. """
+def _lire(chemin: Path, filename, sheet, stat: os.stat_result) -> Optional[Dict]:
+    try:
+        with open(chemin, 'rb') as f:
+            contenu = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+        return None
+    cle = contenu.get('cle', {})
+    if cle.get('version') != VERSION or cle.get('feuille') != sheet:
+        return None
+    if cle.get('taille') == stat.st_size and cle.get('mtime_ns') == stat.st_mtime_ns:
+        return contenu
+    # Fichier touché (copie, checkout…) : le contenu est peut-être identique
+    if cle.get('taille') == stat.st_size and cle.get('sha256') == empreinte(filename):
+        cle['mtime_ns'] = stat.st_mtime_ns
+        try:
+            _ecrire(chemin, contenu)
+        except OSError:
+            pass
+        return contenu
+    return None
+
+
+def _ecrire(chemin: Path, contenu: Dict):
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    temporaire = chemin.with_suffix('.tmp')
+    with open(temporaire, 'wb') as f:
+        pickle.dump(contenu, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporaire, chemin)
+
+
+""" Charge les groupes comme load_groups, en passant par l'instantané s'il est à jour. """
+def charger(filename, sheet, groupes=None, dossier=None) -> Dict:
+    stat = os.stat(filename)
+    chemin = chemin_instantane(filename, sheet, dossier)
+    contenu = _lire(chemin, filename, sheet, stat)
+    if contenu is None:
+        contenu = {'cle': {'version': VERSION, 'chemin': str(Path(filename).resolve()), 'feuille': sheet,
+                           'taille': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                           'sha256': empreinte(filename)},
+                   'colonnes': construire(filename, sheet)}
+        try:
+            _ecrire(chemin, contenu)
+        except OSError:
+            pass  # dossier en lecture seule : on se passe d'instantané
+    return groupes_depuis_colonnes(contenu['colonnes'], groupes)
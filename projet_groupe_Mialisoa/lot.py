@@ -0,0 +1,108 @@
+import contextlib
+import io
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+from glouton import creer_groupes_glouton
+from models import GroupeTP, Repartition
+from multi_depart import multi_depart
+from statistiques import Statistiques
+from voisinage_large import creer_groupes_voisinage
+
+""" Traitement par lot : répartition de tous les groupes de TD d'une promotion.
+Le classeur est lu une seule fois, puis chaque groupe de TD est traité dans un
+processus distinct : la durée totale est celle du groupe le plus long plutôt
+que la somme des exécutions. Chaque groupe est réparti par repartir, comme un
+groupe seul en ligne de commande (mêmes options) ; les départs multiples d'un
+groupe sont alors exécutés dans son processus.
+"""
+
+
+class ResultatGroupe(object):
+    """ Répartition d'un groupe de TD, avec sa durée de calcul et les messages du solveur. """
+
+    def __init__(self, nom, groupes: Dict, duree_s: float, messages: str, objectif=None):
+        self.nom = nom
+        self.groupes = groupes
+        self.duree_s = duree_s
+        self.messages = messages
+        self.objectif = objectif
+
+    def score(self) -> Optional[float]:
+        # Valeur de l'objectif (l'écart par défaut)
+        if not self.groupes:
+            return None
+        return Repartition(*self.groupes.values()).valeur(self.objectif)
+
+    def valide(self) -> Optional[bool]:
+        if not self.groupes:
+            return None
+        return Repartition(*self.groupes.values()).validite()
+
+    def as_dict(self) -> Dict:
+        score = self.score()
+        return {'groupe': self.nom,
+                'duree_s': self.duree_s,
+                'score': None if score is None else round(score, 6),
+                'groupes': {str(nom): [e.prenom for e in gr.members] for nom, gr in self.groupes.items()}}
+
+
+""" Répartit g selon les options de la ligne de commande : grand voisinage
+(voisinage), glouton à départs multiples (departs > 1, sur workers processus)
+ou glouton simple, avec recherche locale (amelioration), budget_s, strict,
+objectif (objectifs.Objectif), cache (CacheSolutions) et stats (Statistiques)
+pour les solveurs qui les acceptent (voir la vérification des options dans
+creer_groupes.main).
+"""
+def repartir(g: GroupeTP, nb_groupes: int, amelioration: bool = False, budget_s: float = 1.0,
+             strict: bool = False, objectif=None, cache=None, voisinage: bool = False, departs: int = 1,
+             graine: int = 0, workers: Optional[int] = None, stats: Optional[Statistiques] = None) -> Dict:
+    if voisinage:
+        return creer_groupes_voisinage(g, nb_groupes, budget_s=budget_s, graine=graine, stats=stats,
+                                       strict=strict, amelioration=amelioration)
+    if departs > 1:
+        return multi_depart(g, nb_groupes, nb_departs=departs, graine=graine, workers=workers,
+                            amelioration=amelioration, budget_amelioration_s=budget_s, objectif=objectif,
+                            strict=strict)
+    return creer_groupes_glouton(g, nb_groupes, amelioration=amelioration, budget_s=budget_s, cache=cache,
+                                 stats=stats, strict=strict, objectif=objectif)
+
+
+""" Traite un groupe de TD avec les options de repartir ; les messages affichés
+par le solveur sont capturés.
+"""
+def resoudre_groupe(g: GroupeTP, nb_groupes: int, amelioration: bool, budget_s: float,
+                    options: Optional[Dict] = None) -> ResultatGroupe:
+    options = options or {}
+    sortie = io.StringIO()
+    debut = time.perf_counter()
+    with contextlib.redirect_stdout(sortie):
+        groupes = repartir(g, nb_groupes, amelioration=amelioration, budget_s=budget_s, **options)
+    return ResultatGroupe(g.nom, groupes, time.perf_counter() - debut, sortie.getvalue(),
+                          options.get('objectif'))
+
+
+""" Traite tous les groupes de promo, en parallèle si workers != 1.
+options : autres arguments de repartir (strict, objectif, cache, voisinage,
+departs, graine) ; les départs multiples d'un groupe restent dans son processus.
+Les résultats sont rendus dans l'ordre de promo.
+"""
+def resoudre_promo(promo: Dict[str, GroupeTP], nb_groupes: int = 3, workers: Optional[int] = None,
+                   amelioration: bool = False, budget_s: float = 1.0,
+                   options: Optional[Dict] = None) -> List[ResultatGroupe]:
+    options = dict(options or {}, workers=1)
+    groupes = list(promo.values())
+    if workers == 1 or len(groupes) <= 1:
+        return [resoudre_groupe(g, nb_groupes, amelioration, budget_s, options) for g in groupes]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(resoudre_groupe, groupes, [nb_groupes] * len(groupes),
+                             [amelioration] * len(groupes), [budget_s] * len(groupes),
+                             [options] * len(groupes)))
+
+
+""" Exporte les résultats au format JSON. """
+def exporter(resultats: List[ResultatGroupe], filename):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump([r.as_dict() for r in resultats], f, indent=2, ensure_ascii=False)
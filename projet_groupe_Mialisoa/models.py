@@ -1,8 +1,10 @@
-from typing import List, Sequence
+from collections import Counter
+from typing import Collection, List, Sequence
 
 from grouping import BoundedPartition, BoundedGroup
 
 class Etudiant(object):
+    __slots__ = ('nom', 'prenom', 'avantage', 'leader', 'polarite')
 
     def __init__(self, nom, prenom, avantage: float, leader=False, polarite: int = None):
         self.nom = nom
@@ -18,26 +20,73 @@ class Etudiant(object):
         return (self.nom, self.prenom) < (other.nom, other.prenom)
 
 
-def has_duplicate_numbers(li):
-    for i, n in enumerate(li):
-        if n is None:
-            continue
-        if n in li[i+1:]:
-            return True
-    return False
-
-
 class GroupeProjet(BoundedGroup):
+    """
+    Groupe de projet dont l'avantage total, le nombre de leaders et les polarités
+    sont tenus à jour par add_member / pop_last / remove_member : chaque requête
+    est en O(1).
+    Les attributs d'un étudiant ne doivent pas changer tant qu'il est membre.
+    """
+
+    def __init__(self, name=None, members: Collection = (), room: int = 0):
+        super(GroupeProjet, self).__init__(name=name, members=members, room=room)
+        self._avantage = 0
+        self._leaders = 0
+        self._polarites = Counter()
+        self._doublons = 0
+        for etu in self.members:
+            self._compter(etu, 1)
+
+    def _compter(self, etu, sens: int):
+        self._avantage += sens * etu.avantage
+        if etu.leader:
+            self._leaders += sens
+        p = etu.polarite
+        if p is not None:
+            if sens > 0:
+                if self._polarites[p]:
+                    self._doublons += 1
+                self._polarites[p] += 1
+            else:
+                self._polarites[p] -= 1
+                if self._polarites[p]:
+                    self._doublons -= 1
+                else:
+                    del self._polarites[p]
+
+    def add_member(self, m):
+        super(GroupeProjet, self).add_member(m)
+        self._compter(m, 1)
+
+    def pop_last(self):
+        m = self.members[-1]
+        super(GroupeProjet, self).pop_last()
+        self._compter(m, -1)
+
+    def remove_member(self, m):
+        super(GroupeProjet, self).remove_member(m)
+        self._compter(m, -1)
 
     def avantage(self):
-        return sum(etu.avantage for etu in self.members)
+        return self._avantage
 
     def avec_leader(self):
-        return any(etu.leader for etu in self.members)
+        return self._leaders > 0
+
+    def nb_leaders(self) -> int:
+        return self._leaders
+
+    def contient_polarite(self, p) -> bool:
+        return self._polarites[p] > 0
+
+    def nb_polarite(self, p) -> int:
+        return self._polarites[p]
 
     def incompatible(self):
-        polarites = [etu.polarite for etu in self.members if etu.polarite is not None]
-        return has_duplicate_numbers(polarites)
+        return self._doublons > 0
+
+    def nb_doublons(self) -> int:
+        return self._doublons
 
     def __repr__(self):
         return super(GroupeProjet, self).__repr__() + f'={self.avantage():.1f}'
@@ -72,4 +121,10 @@ class Repartition(BoundedPartition):
 
     def optimalite(self):
         avantages = [g.avantage() for g in self.groups.values()]
-        return max(avantages) - min(avantages)
\ No newline at end of file
+        return max(avantages) - min(avantages)
+
+    def valeur(self, objectif=None) -> float:
+        """ Valeur de l'objectif (objectifs.Objectif) ; sans objectif, l'écart optimalite(). """
+        if objectif is None:
+            return self.optimalite()
+        return objectif.evaluer([g.members for g in self.groups.values()])
\ No newline at end of file
@@ -0,0 +1,127 @@
+import contextlib
+import io
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+from faisabilite import analyser
+from glouton import creer_groupes_glouton
+from models import GroupeProjet, GroupeTP, Repartition
+
+""" Glouton à départs multiples.
+Le glouton est relancé nb_departs fois : le départ 0 est le passage déterministe
+habituel, le départ i > 0 un passage aléatoire de graine f"{graine}:{i}" (ordre
+de placement perturbé par des tirages, égalités départagées au hasard). Les
+départs sont répartis sur un pool de processus et la meilleure répartition
+valide est gardée (plus petit écart, puis plus petit numéro de départ) : à
+graine et nb_departs donnés, le résultat est reproductible tant que le budget
+de temps n'interrompt pas les départs.
+"""
+
+
+class Depart(object):
+    """ Résultat d'un départ : groupe de chaque étudiant (dans l'ordre de g.etudiants). """
+
+    def __init__(self, numero: int, affectation: Optional[List[int]], valide: bool, score: float):
+        self.numero = numero
+        self.affectation = affectation
+        self.valide = valide
+        self.score = score
+
+    def cle(self) -> Tuple:
+        # Ordre de préférence entre départs
+        return (not self.valide, self.score, self.numero)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.numero}, valide={self.valide}, score={self.score})'
+
+
+""" Graine du départ numero (None pour le départ déterministe). """
+def graine_depart(graine: int, numero: int) -> Optional[str]:
+    return None if numero == 0 else f"{graine}:{numero}"
+
+
+""" Exécute un départ ; les messages du glouton sont ignorés.
+echeance : date (time.time(), commune aux processus) au-delà de laquelle la
+recherche locale s'arrête, quel que soit budget_s.
+"""
+def depart(g: GroupeTP, nb_groupes: int, numero: int, graine: int = 0, bruit: float = 0.1,
+           amelioration: bool = False, budget_s: float = 1.0, objectif=None,
+           echeance: Optional[float] = None) -> Depart:
+    if echeance is not None:
+        budget_s = max(0.0, min(budget_s, echeance - time.time()))
+    with contextlib.redirect_stdout(io.StringIO()):
+        groupes = creer_groupes_glouton(g, nb_groupes, amelioration=amelioration, budget_s=budget_s,
+                                        graine=graine_depart(graine, numero), bruit=bruit, objectif=objectif)
+    if not groupes:
+        return Depart(numero, None, False, float('inf'))
+    ordre = list(groupes.values())
+    position = {id(e): k for k, gr in enumerate(ordre) for e in gr.members}
+    rep = Repartition(*ordre)
+    return Depart(numero, [position[id(e)] for e in g.etudiants], rep.validite(), rep.valeur(objectif))
+
+
+""" Meilleure répartition sur nb_departs départs du glouton.
+workers : nombre de processus (1 : tout dans le processus courant).
+budget_s : échéance du multi-départ. La recherche locale de chaque départ
+s'arrête à l'échéance, les départs pas encore commencés sont annulés et ceux en
+cours ne sont plus attendus, dès qu'au moins un départ a abouti. Le retour peut
+donc dépasser l'échéance d'un passage glouton et d'une itération de la
+recherche locale. Un départ abandonné finit son passage glouton dans son
+processus, et la sortie de l'interpréteur attend ce processus.
+Avec verbeux, le nombre de départs évalués et le départ retenu sont affichés.
+Avec un objectif (objectifs.Objectif), les départs sont comparés sur sa valeur.
+Avec strict=True, une entrée prouvée infaisable (faisabilite.analyser) est refusée
+avant tout départ : les raisons sont affichées et {} est retourné.
+Retourne {} si aucun départ n'a abouti.
+"""
+def multi_depart(g: GroupeTP, nb_groupes: int, nb_departs: int = 16, graine: int = 0,
+                 budget_s: Optional[float] = None, workers: Optional[int] = None, bruit: float = 0.1,
+                 amelioration: bool = False, budget_amelioration_s: float = 1.0,
+                 verbeux: bool = True, objectif=None, strict: bool = False) -> Dict:
+    if strict:
+        analyse = analyser(g.etudiants, g.repartition(nb_groupes))
+        if not analyse.faisable:
+            for raison in analyse.raisons:
+                print(raison)
+            print("Aucune répartition effectuée.")
+            return {}
+    fin = None if budget_s is None else time.perf_counter() + budget_s
+    parametres = dict(graine=graine, bruit=bruit, amelioration=amelioration, budget_s=budget_amelioration_s,
+                      objectif=objectif, echeance=None if budget_s is None else time.time() + budget_s)
+    departs: List[Depart] = []
+    if workers == 1 or nb_departs <= 1:
+        for numero in range(nb_departs):
+            if fin is not None and numero and time.perf_counter() > fin:
+                break
+            departs.append(depart(g, nb_groupes, numero, **parametres))
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        try:
+            en_cours = {pool.submit(depart, g, nb_groupes, numero, **parametres) for numero in range(nb_departs)}
+            while en_cours:
+                # Tant qu'aucun départ n'a fini, on l'attend sans limite
+                delai = None if fin is None or not departs else max(0.0, fin - time.perf_counter())
+                finis, en_cours = wait(en_cours, timeout=delai, return_when=FIRST_COMPLETED)
+                departs.extend(f.result() for f in finis)
+                if fin is not None and time.perf_counter() > fin and departs:
+                    break
+        finally:
+            # Le budget est une échéance : les départs en cours ne sont pas attendus
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    meilleur = min(departs, key=Depart.cle, default=None)
+    if meilleur is None or meilleur.affectation is None:
+        if verbeux:
+            print("Aucun départ n'a produit de répartition.")
+        return {}
+    if verbeux:
+        etat = "valide" if meilleur.valide else "non valide"
+        print(f"Multi-départ : {len(departs)}/{nb_departs} départ(s), "
+              f"meilleur n°{meilleur.numero} ({etat}), score {meilleur.score:.2f}")
+
+    groupes = [GroupeProjet(name=n, room=capacite)
+               for n, capacite in enumerate(g.repartition(nb_groupes), start=1)]
+    for e, k in zip(g.etudiants, meilleur.affectation):
+        groupes[k].add_member(e)
+    return Repartition(*groupes).groups
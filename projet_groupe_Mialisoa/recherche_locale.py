@@ -0,0 +1,221 @@
+import time
+from typing import List, Optional, Set, Tuple
+
+from models import GroupeProjet, Repartition
+
+""" Amélioration d'une répartition par recherche locale (descente).
+Une répartition de départ invalide (groupe sans leader, doublon de polarité) est
+d'abord corrigée par échanges. Puis, à chaque itération, on applique le meilleur
+déplacement ou échange d'étudiants entre deux groupes qui fait baisser l'écart
+max - min des avantages (ou la valeur d'un objectif, voir objectifs), jusqu'à un
+optimum local ou l'épuisement du budget de temps. Les mouvements de la descente
+ne créent aucune violation.
+"""
+
+# Tolérance sur les sommes d'avantages (flottants)
+EPS = 1e-9
+
+
+def deplacement_ok(src: GroupeProjet, dst: GroupeProjet, e) -> bool:
+    # Capacité, leader restant dans src et polarité absente de dst
+    if dst.is_full():
+        return False
+    if e.leader and src.nb_leaders() == 1:
+        return False
+    return e.polarite is None or not dst.contient_polarite(e.polarite)
+
+
+def echange_ok(ga: GroupeProjet, gb: GroupeProjet, ea, eb) -> bool:
+    # Chaque groupe garde au moins un leader
+    if ea.leader and not eb.leader and ga.nb_leaders() == 1:
+        return False
+    if eb.leader and not ea.leader and gb.nb_leaders() == 1:
+        return False
+    # Même polarité des deux côtés : aucun doublon créé
+    if ea.polarite == eb.polarite:
+        return True
+    if ea.polarite is not None and gb.contient_polarite(ea.polarite):
+        return False
+    return eb.polarite is None or not ga.contient_polarite(eb.polarite)
+
+
+def violations(groupes: List[GroupeProjet]) -> int:
+    # Groupes sans leader et doublons de polarité
+    return sum(int(not gr.avec_leader()) + gr.nb_doublons() for gr in groupes)
+
+
+def _delta_violations(gr: GroupeProjet, sortant, entrant) -> int:
+    # Variation du nombre de violations de gr quand sortant y est remplacé par entrant
+    delta = 0
+    leaders = gr.nb_leaders() - sortant.leader + entrant.leader
+    delta += int(leaders == 0) - int(not gr.avec_leader())
+    if sortant.polarite != entrant.polarite:
+        if sortant.polarite is not None and gr.nb_polarite(sortant.polarite) >= 2:
+            delta -= 1
+        if entrant.polarite is not None and gr.nb_polarite(entrant.polarite) >= 1:
+            delta += 1
+    return delta
+
+
+def corriger(groupes: List[GroupeProjet], mobiles: Set, fin: float) -> int:
+    """ Corrige les contraintes violées par le meilleur échange impliquant un groupe fautif.
+    Chaque échange retenu diminue le plus le nombre de violations ; à égalité, le plus petit écart.
+    Les étudiants échangés sont ajoutés à mobiles ; retourne le nombre d'échanges.
+    """
+    nb_echanges = 0
+    nb_violations = violations(groupes)
+    while nb_violations and time.perf_counter() < fin:
+        meilleur, echange = (0, float('inf')), None
+        totaux = [gr.avantage() for gr in groupes]
+        fautifs = [a for a, gr in enumerate(groupes) if not gr.avec_leader() or gr.incompatible()]
+        for a in fautifs:
+            for b in range(len(groupes)):
+                if b == a:
+                    continue
+                ga, gb = groupes[a], groupes[b]
+                autres = [t for i, t in enumerate(totaux) if i != a and i != b]
+                haut_autres = max(autres, default=-float('inf'))
+                bas_autres = min(autres, default=float('inf'))
+                for ea in ga.members:
+                    for eb in gb.members:
+                        delta = _delta_violations(ga, ea, eb) + _delta_violations(gb, eb, ea)
+                        if delta >= 0 or delta > meilleur[0]:
+                            continue
+                        ta, tb = totaux[a] - ea.avantage + eb.avantage, totaux[b] - eb.avantage + ea.avantage
+                        ecart = max(haut_autres, ta, tb) - min(bas_autres, ta, tb)
+                        if delta < meilleur[0] or ecart < meilleur[1] - EPS:
+                            meilleur, echange = (delta, ecart), (ga, gb, ea, eb)
+        if echange is None:
+            break  # contraintes impossibles à satisfaire (pas assez de leaders, polarité trop fréquente)
+        ga, gb, ea, eb = echange
+        ga.remove_member(ea)
+        gb.remove_member(eb)
+        ga.add_member(eb)
+        gb.add_member(ea)
+        mobiles.update((ea, eb))
+        nb_violations += meilleur[0]
+        nb_echanges += 1
+    return nb_echanges
+
+
+def meilleur_mouvement(groupes: List[GroupeProjet], mobiles: Optional[Set] = None,
+                       objectif=None, etats: Optional[list] = None) -> Tuple[float, Optional[tuple]]:
+    """ Cherche le mouvement qui minimise l'écart.
+    Retourne (écart obtenu, (a, ea, b, eb)) avec eb None pour un simple déplacement.
+    Si mobiles est donné, seuls les mouvements impliquant l'un de ces étudiants sont envisagés.
+    Avec un objectif (objectifs.Objectif), c'est sa valeur qui est minimisée ;
+    etats contient alors l'état de l'objectif pour chaque groupe.
+    """
+    if objectif is not None:
+        return _meilleur_mouvement_objectif(groupes, mobiles, objectif, etats)
+    totaux = [gr.avantage() for gr in groupes]
+    haut, bas = max(totaux), min(totaux)
+    meilleur_ecart, meilleur = haut - bas, None
+    # Seul un mouvement touchant un groupe extrême peut réduire l'écart
+    extremes = [i for i, t in enumerate(totaux) if t >= haut - EPS or t <= bas + EPS]
+    paires = {(min(a, b), max(a, b)) for a in extremes for b in range(len(groupes)) if a != b}
+    for a, b in sorted(paires):
+        ga, gb = groupes[a], groupes[b]
+        autres = [t for i, t in enumerate(totaux) if i != a and i != b]
+        haut_autres = max(autres, default=-float('inf'))
+        bas_autres = min(autres, default=float('inf'))
+
+        def ecart(ta, tb):
+            # Évaluation incrémentale : seuls les totaux de a et b changent
+            return max(haut_autres, ta, tb) - min(bas_autres, ta, tb)
+
+        for src, dst, g_src, g_dst in ((a, b, ga, gb), (b, a, gb, ga)):
+            for e in g_src.members:
+                if mobiles is not None and e not in mobiles:
+                    continue
+                if not deplacement_ok(g_src, g_dst, e):
+                    continue
+                nouveau = ecart(totaux[src] - e.avantage, totaux[dst] + e.avantage)
+                if nouveau < meilleur_ecart - EPS:
+                    meilleur_ecart, meilleur = nouveau, (src, e, dst, None)
+        for ea in ga.members:
+            for eb in gb.members:
+                if mobiles is not None and ea not in mobiles and eb not in mobiles:
+                    continue
+                delta = eb.avantage - ea.avantage
+                if abs(delta) <= EPS or not echange_ok(ga, gb, ea, eb):
+                    continue
+                nouveau = ecart(totaux[a] + delta, totaux[b] - delta)
+                if nouveau < meilleur_ecart - EPS:
+                    meilleur_ecart, meilleur = nouveau, (a, ea, b, eb)
+    return meilleur_ecart, meilleur
+
+
+def _meilleur_mouvement_objectif(groupes: List[GroupeProjet], mobiles: Optional[Set], objectif,
+                                 etats: Optional[list]) -> Tuple[float, Optional[tuple]]:
+    # Même voisinage, évalué par les mesures de l'objectif : toutes les paires de groupes
+    if etats is None:
+        etats = [objectif.etat_de(gr.members) for gr in groupes]
+    mesures = [objectif.mesure(etat) for etat in etats]
+    meilleure_valeur, meilleur = objectif.valeur(mesures), None
+    for a in range(len(groupes)):
+        for b in range(a + 1, len(groupes)):
+            ga, gb = groupes[a], groupes[b]
+            contexte = objectif.contexte(mesures, a, b)
+            for src, dst, g_src, g_dst in ((a, b, ga, gb), (b, a, gb, ga)):
+                for e in g_src.members:
+                    if mobiles is not None and e not in mobiles:
+                        continue
+                    if not deplacement_ok(g_src, g_dst, e):
+                        continue
+                    valeur = objectif.valeur_avec(contexte, objectif.mesure_apres(etats[src], sortant=e),
+                                                  objectif.mesure_apres(etats[dst], entrant=e))
+                    if valeur < meilleure_valeur - EPS:
+                        meilleure_valeur, meilleur = valeur, (src, e, dst, None)
+            for ea in ga.members:
+                for eb in gb.members:
+                    if mobiles is not None and ea not in mobiles and eb not in mobiles:
+                        continue
+                    if not echange_ok(ga, gb, ea, eb):
+                        continue
+                    valeur = objectif.valeur_avec(contexte, objectif.mesure_apres(etats[a], ea, eb),
+                                                  objectif.mesure_apres(etats[b], eb, ea))
+                    if valeur < meilleure_valeur - EPS:
+                        meilleure_valeur, meilleur = valeur, (a, ea, b, eb)
+    return meilleure_valeur, meilleur
+
+
+def ameliorer(rep: Repartition, budget_s: float = 1.0, mobiles: Optional[Set] = None, stats=None,
+              cible: Optional[float] = None, objectif=None) -> int:
+    """ Applique la descente sur rep (modifiée sur place), après correction des
+    contraintes violées (corriger) ; les étudiants échangés par la correction
+    sont ajoutés à mobiles.
+    Retourne le nombre de mouvements effectués, échanges de correction compris ;
+    chaque mouvement de la descente est enregistré comme amélioration dans stats
+    (Statistiques) si elle est fournie.
+    cible est une borne inférieure de l'écart (faisabilite.borne_inferieure) :
+    la descente s'arrête dès qu'elle est atteinte.
+    Avec un objectif, c'est sa valeur qui est minimisée (cible est alors ignorée) ;
+    son état par groupe est mis à jour à chaque mouvement appliqué.
+    """
+    groupes = list(rep.groups.values())
+    fin = time.perf_counter() + budget_s
+    nb_mouvements = corriger(groupes, set() if mobiles is None else mobiles, fin)
+    etats = None if objectif is None else [objectif.etat_de(gr.members) for gr in groupes]
+    while time.perf_counter() < fin:
+        if objectif is None and cible is not None and rep.optimalite() <= cible + EPS and rep.validite():
+            break  # optimum prouvé
+        ecart, mouvement = meilleur_mouvement(groupes, mobiles, objectif, etats)
+        if mouvement is None:
+            break  # optimum local
+        a, ea, b, eb = mouvement
+        groupes[a].remove_member(ea)
+        if eb is not None:
+            groupes[b].remove_member(eb)
+            groupes[a].add_member(eb)
+        groupes[b].add_member(ea)
+        if etats is not None:
+            objectif.retirer(etats[a], ea)
+            objectif.ajouter(etats[b], ea)
+            if eb is not None:
+                objectif.retirer(etats[b], eb)
+                objectif.ajouter(etats[a], eb)
+        nb_mouvements += 1
+        if stats is not None:
+            stats.ameliorer(ecart)
+    return nb_mouvements
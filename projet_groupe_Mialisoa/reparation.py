@@ -0,0 +1,109 @@
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models import Etudiant, GroupeProjet, Repartition
+from recherche_locale import ameliorer
+
+""" Réparation incrémentale d'une répartition après une modification de la liste.
+Au lieu de tout recalculer, on part de la répartition existante :
+  1) les départs sont retirés, les étudiants modifiés sont mis à jour sur place ;
+  2) les capacités sont réajustées ; un groupe en surnombre libère un étudiant ;
+  3) les arrivées et les étudiants libérés sont placés comme dans le glouton ;
+  4) les contraintes violées (groupe sans leader, doublon de polarité) sont
+     corrigées par des échanges, puis l'écart est amélioré par recherche locale.
+La recherche locale n'envisage que les mouvements impliquant un membre d'un
+groupe touché par la modification (ou un étudiant déplacé par une correction).
+"""
+
+# Attributs d'un étudiant modifiables par reparer
+ATTRIBUTS = ('avantage', 'leader', 'polarite')
+
+
+def _groupe_de(rep: Repartition, e) -> GroupeProjet:
+    for gr in rep.groups.values():
+        if any(m is e for m in gr.members):
+            return gr
+    raise ValueError(f"{e} n'appartient à aucun groupe de la répartition")
+
+
+""" Réajuste les capacités à la nouvelle taille de la liste.
+Les plus grandes capacités vont aux groupes les plus remplis, pour limiter les départs forcés.
+"""
+def _reajuster(groupes: List[GroupeProjet], nb_etudiants: int):
+    nb = len(groupes)
+    tailles = [nb_etudiants // nb + int(i < nb_etudiants % nb) for i in range(nb)]
+    for gr, taille in zip(sorted(groupes, key=lambda gr: len(gr.members), reverse=True), tailles):
+        gr.capacity = taille
+
+
+""" Retire d'un groupe en surnombre l'étudiant dont l'avantage compense le mieux son excédent. """
+def _liberer(gr: GroupeProjet, moyenne: float):
+    exces = gr.avantage() - moyenne * gr.capacity
+    retirables = [e for e in gr.members if not (e.leader and gr.nb_leaders() == 1)] or list(gr.members)
+    e = min(retirables, key=lambda e: abs(e.avantage - exces))
+    gr.remove_member(e)
+    return e
+
+
+""" Place un étudiant libre : polarité respectée si possible, puis groupe le plus faible
+(un leader va de préférence dans un groupe qui n'en a pas).
+"""
+def _placer(groupes: List[GroupeProjet], e) -> GroupeProjet:
+    libres = [gr for gr in groupes if not gr.is_full()]
+    candidats = [gr for gr in libres if e.polarite is None or not gr.contient_polarite(e.polarite)] or libres
+    if e.leader:
+        cible = min(candidats, key=lambda gr: (gr.avec_leader(), gr.avantage()))
+    else:
+        cible = min(candidats, key=lambda gr: gr.avantage())
+    cible.add_member(e)
+    return cible
+
+
+def reparer(rep: Repartition, arrivees: Iterable[Etudiant] = (), departs: Iterable[Etudiant] = (),
+            modifications: Optional[Dict[Etudiant, Dict]] = None,
+            budget_s: float = 1.0) -> List[Tuple[Etudiant, object, object]]:
+    """ Répare rep (modifiée sur place) après l'arrivée, le départ ou la modification d'étudiants.
+    :param modifications: nouveaux attributs de chaque étudiant modifié, ex. {e: {'leader': True}}
+    :return: mouvements (étudiant, ancien groupe, nouveau groupe) des étudiants qui ont
+    changé de groupe ; l'ancien groupe d'une arrivée est None.
+    """
+    fin = time.perf_counter() + budget_s
+    groupes = list(rep.groups.values())
+    avant = {id(e): gr.name for gr in groupes for e in gr.members}
+
+    # Groupes touchés par la modification : leurs membres forment le voisinage exploré
+    touches = set()
+    for e in departs:
+        gr = _groupe_de(rep, e)
+        gr.remove_member(e)
+        touches.add(gr.name)
+
+    # Mise à jour sur place : l'étudiant sort du groupe le temps de changer ses attributs
+    for e, attributs in (modifications or {}).items():
+        inconnus = set(attributs) - set(ATTRIBUTS)
+        if inconnus:
+            raise ValueError(f"Attribut(s) non modifiable(s) : {sorted(inconnus)}")
+        gr = _groupe_de(rep, e)
+        gr.remove_member(e)
+        for attribut, valeur in attributs.items():
+            setattr(e, attribut, valeur)
+        gr.add_member(e)
+        touches.add(gr.name)
+
+    arrivees = list(arrivees)
+    _reajuster(groupes, rep.member_count + len(arrivees))
+    total = sum(gr.avantage() for gr in groupes) + sum(e.avantage for e in arrivees)
+    moyenne = total / max(1, rep.member_count + len(arrivees))
+    libres = list(arrivees)
+    for gr in groupes:
+        while gr.room < 0:
+            libres.append(_liberer(gr, moyenne))
+            touches.add(gr.name)
+    for e in sorted(libres, key=lambda e: (not e.leader, -e.avantage)):
+        touches.add(_placer(groupes, e).name)
+    mobiles = {e for gr in groupes if gr.name in touches for e in gr.members}
+
+    ameliorer(rep, max(0.0, fin - time.perf_counter()), mobiles)
+
+    return [(e, avant.get(id(e)), gr.name) for gr in groupes for e in gr.members
+            if avant.get(id(e)) != gr.name]
@@ -0,0 +1,85 @@
+import cProfile
+import pstats
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Tuple
+
+""" Instrumentation des solveurs.
+Une Statistiques passée à un solveur reçoit les nœuds visités, les branches
+élaguées par raison, les feuilles (répartitions complètes) évaluées, chaque
+amélioration de la meilleure solution avec son instant, et la durée des phases
+(chargement, résolution, affichage).
+Sans Statistiques, les solveurs utilisent leur boucle habituelle : aucun
+compteur supplémentaire n'est exécuté.
+"""
+
+# Raisons d'élagage d'une branche
+RAISONS = ('capacite', 'leader', 'polarite', 'borne', 'symetrie')
+
+
+class Statistiques(object):
+
+    def __init__(self):
+        self.debut = time.perf_counter()
+        self.noeuds = 0
+        self.feuilles = 0
+        self.elagages: Dict[str, int] = dict.fromkeys(RAISONS, 0)
+        # (secondes depuis la création, score) de chaque nouvelle meilleure solution
+        self.ameliorations: List[Tuple[float, float]] = []
+        self.phases: Dict[str, float] = {}
+
+    def ameliorer(self, score: float):
+        self.ameliorations.append((time.perf_counter() - self.debut, score))
+
+    @contextmanager
+    def phase(self, nom: str):
+        """ Ajoute la durée du bloc à la phase nom. """
+        debut = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.phases[nom] = self.phases.get(nom, 0.0) + time.perf_counter() - debut
+
+    def as_dict(self) -> Dict:
+        return {'noeuds': self.noeuds,
+                'feuilles': self.feuilles,
+                'elagages': dict(self.elagages),
+                'ameliorations': [{'t_s': round(t, 6), 'score': score} for t, score in self.ameliorations],
+                'phases_s': {nom: round(d, 6) for nom, d in self.phases.items()}}
+
+    def rapport(self) -> str:
+        lignes = [f"Nœuds visités : {self.noeuds}",
+                  f"Feuilles évaluées : {self.feuilles}",
+                  "Élagages : " + ", ".join(f"{r}={n}" for r, n in self.elagages.items())]
+        if self.ameliorations:
+            lignes.append("Améliorations : " + ", ".join(f"{score:.2f} à {t:.3f}s"
+                                                          for t, score in self.ameliorations))
+        if self.phases:
+            lignes.append("Phases : " + ", ".join(f"{nom} {d:.3f}s" for nom, d in self.phases.items()))
+        return "\n".join(lignes)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.as_dict()})'
+
+
+""" Chronomètre la phase nom si stats n'est pas None. """
+def phase(stats, nom: str):
+    return nullcontext() if stats is None else stats.phase(nom)
+
+
+""" Profile le bloc avec cProfile si fichier est donné : le profil est enregistré
+(lisible avec pstats) et les fonctions les plus coûteuses sont affichées.
+"""
+@contextmanager
+def profiler(fichier=None, nb_lignes: int = 15):
+    if fichier is None:
+        yield None
+        return
+    profil = cProfile.Profile()
+    profil.enable()
+    try:
+        yield profil
+    finally:
+        profil.disable()
+        profil.dump_stats(fichier)
+        pstats.Stats(profil).sort_stats('cumulative').print_stats(nb_lignes)
@@ -0,0 +1,210 @@
+import itertools
+import random
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from faisabilite import borne_inferieure
+from glouton import afficher_score, creer_groupes_glouton
+from models import GroupeProjet, GroupeTP, Repartition
+from recherche import RechercheExacte, echelle_entiere
+from statistiques import Statistiques
+
+""" Recherche à grand voisinage (LNS) à partir d'une répartition existante.
+À chaque itération, on choisit 2 ou 3 groupes de projet dont l'un est le plus ou
+le moins chargé (seul un tel choix peut réduire l'écart global), on met leurs
+membres en commun et on les répartit de nouveau dans ces mêmes groupes par une
+recherche exacte qui minimise l'écart de toute la répartition (RechercheVoisinage).
+La nouvelle répartition est gardée si elle améliore la répartition globale :
+moins de groupes invalides (sans leader ou avec un doublon de polarité), puis un
+écart plus petit, puis moins de groupes à l'écart maximal (voir qualite).
+La recherche s'arrête à l'épuisement du budget, quand l'écart atteint la borne
+inférieure (faisabilite) ou quand aucun sous-ensemble ne l'améliore plus.
+"""
+
+# Tolérance sur les sommes d'avantages (flottants)
+EPS = 1e-9
+
+
+def _invalide(gr: GroupeProjet) -> bool:
+    return not gr.avec_leader() or gr.incompatible()
+
+
+""" Clé de comparaison d'une répartition : (nombre de groupes invalides, écart,
+nombre de groupes au maximum ou au minimum). Le dernier terme départage les
+écarts égaux : moins il y a de groupes extrêmes, plus l'écart est près de baisser.
+"""
+def qualite(groupes: Sequence[GroupeProjet]) -> Tuple[int, float, int]:
+    totaux = [gr.avantage() for gr in groupes]
+    haut, bas = max(totaux), min(totaux)
+    return (sum(_invalide(gr) for gr in groupes), haut - bas,
+            sum(1 for t in totaux if t >= haut - EPS or t <= bas + EPS))
+
+
+""" Sous-ensembles de taille groupes à essayer, ceux qui contiennent un groupe extrême. """
+def sous_ensembles(groupes: Sequence[GroupeProjet], taille: int) -> List[Tuple[int, ...]]:
+    totaux = [gr.avantage() for gr in groupes]
+    haut, bas = max(totaux), min(totaux)
+    extremes = {k for k, t in enumerate(totaux) if t >= haut - EPS or t <= bas + EPS}
+    extremes |= {k for k, gr in enumerate(groupes) if _invalide(gr)}
+    return [s for s in itertools.combinations(range(len(groupes)), min(taille, len(groupes)))
+            if extremes.intersection(s)]
+
+
+class RechercheVoisinage(RechercheExacte):
+    """
+    Recherche exacte sur les groupes choisis qui minimise l'écart global : les
+    totaux des autres groupes (inchangés) entrent dans le max et le min d'une
+    répartition complète et dans la borne. Sans autres groupes, c'est la
+    recherche exacte habituelle.
+    """
+
+    def __init__(self, membres: Sequence, capacites: Sequence[int], autres: Sequence[float] = ()):
+        self.autres = list(autres)
+        super(RechercheVoisinage, self).__init__(membres, capacites, verbeux=False)
+        # Totaux des autres groupes, entiers à l'échelle des avantages (voir echelle)
+        totaux = [round(t * self.facteur) for t in self.autres]
+        # Sans autres groupes, la moyenne arrondie est neutre : le groupe le plus
+        # chargé en atteint le plancher, le moins chargé n'en dépasse pas le plafond
+        self.haut_autres = max(totaux, default=self.plancher_moyenne)
+        self.bas_autres = min(totaux, default=self.plafond_moyenne)
+        if autres:
+            # L'écart global ne descend pas sous celui des autres groupes : il y
+            # reste seulement si chaque groupe choisi finit dans [min, max] des autres
+            self.borne_inf = max(self.borne_inf, self.haut_autres - self.bas_autres)
+
+    def echelle(self, avantages: Sequence[float]) -> Tuple[List[int], int]:
+        # Facteur commun aux avantages des membres et aux totaux des autres groupes
+        entiers, facteur = echelle_entiere(list(avantages) + self.autres)
+        return entiers[:len(avantages)], facteur
+
+    def borne(self, i: int) -> int:
+        bas, hauts = self.bas[i], self.hauts[i]
+        plus_bas_max = max(s + bas[p] for s, p in zip(self.sommes, self.places))
+        plus_haut_min = min(s + hauts[p] for s, p in zip(self.sommes, self.places))
+        return (max(plus_bas_max, self.plafond_moyenne, self.haut_autres)
+                - min(plus_haut_min, self.plancher_moyenne, self.bas_autres))
+
+    def score(self, affectation: Sequence[int]) -> int:
+        sommes = [0] * len(self.capacites)
+        for i, k in enumerate(affectation):
+            sommes[k] += self.avantages[i]
+        return max(max(sommes), self.haut_autres) - min(min(sommes), self.bas_autres)
+
+    def _explorer(self, i: int):
+        self.noeuds += 1
+        if not self.noeuds & 255:
+            self._controler()
+        if i == len(self.ordre):
+            self.feuilles += 1
+            score = max(max(self.sommes), self.haut_autres) - min(min(self.sommes), self.bas_autres)
+            if score < self.meilleur_score:
+                self._retenir(score)
+            return
+        for k in self._choix(i):
+            if self._placer(i, k):
+                self.bornes += 1
+                if self.borne(i + 1) < self.meilleur_score:
+                    self._explorer(i + 1)
+            self._retirer(i, k)
+
+
+""" Répartit de nouveau les membres des groupes choisis en minimisant l'écart
+global, les autres groupes restant inchangés.
+Retourne le groupe (parmi choisis) de chaque membre, dans l'ordre de membres,
+ou None si aucune répartition valide n'a été trouvée dans le budget.
+"""
+def reoptimiser(groupes: Sequence[GroupeProjet], choisis: Sequence[int], membres: Sequence,
+                budget_s: Optional[float] = None, budget_noeuds: Optional[int] = None) -> Optional[List[int]]:
+    autres = [gr.avantage() for k, gr in enumerate(groupes) if k not in choisis]
+    recherche = RechercheVoisinage(membres, [groupes[k].capacity for k in choisis], autres)
+    recherche.limiter(budget_s, budget_noeuds)
+    return recherche.explorer()
+
+
+""" Applique la recherche à grand voisinage à rep (modifiée sur place).
+taille : nombre de groupes re-répartis ensemble (2 ou 3 en pratique ; au-delà
+de 3, une recherche exacte dépasse vite son budget de nœuds).
+budget_s : temps total ; budget_noeuds : nœuds explorés au plus par chaque
+recherche exacte (au-delà, sa meilleure solution est utilisée).
+Les sous-ensembles sont essayés dans un ordre tiré avec graine : le résultat est
+reproductible tant que le budget de temps n'interrompt pas la recherche.
+Retourne le nombre de ré-optimisations gardées ; chacune est enregistrée comme
+amélioration dans stats (Statistiques) si elle est fournie.
+"""
+def voisinage_large(rep: Repartition, budget_s: float = 2.0, taille: int = 2, graine: int = 0,
+                    budget_noeuds: Optional[int] = 20000, stats: Optional[Statistiques] = None) -> int:
+    groupes = list(rep.groups.values())
+    if len(groupes) < 2:
+        return 0
+    membres_tous = [e for gr in groupes for e in gr.members]
+    cible = float(borne_inferieure([e.avantage for e in membres_tous], [gr.capacity for gr in groupes]))
+    aleatoire = random.Random(graine)
+    fin = time.perf_counter() + budget_s
+    nb_ameliorations = 0
+    essayes = set()
+    while time.perf_counter() < fin:
+        actuelle = qualite(groupes)
+        if actuelle[0] == 0 and actuelle[1] <= cible + EPS:
+            break  # optimum prouvé
+        candidats = [s for s in sous_ensembles(groupes, taille) if s not in essayes]
+        if not candidats:
+            break  # aucun sous-ensemble n'améliore plus la répartition
+        choisis = aleatoire.choice(candidats)
+        essayes.add(choisis)
+        membres = [e for k in choisis for e in groupes[k].members]
+        affectation = reoptimiser(groupes, choisis, membres, fin - time.perf_counter(), budget_noeuds)
+        if stats is not None:
+            stats.noeuds += 1
+        if affectation is None:
+            continue
+
+        anciens = {k: list(groupes[k].members) for k in choisis}
+        _remplacer(groupes, choisis, membres, affectation)
+        nouvelle = qualite(groupes)
+        if _meilleure(nouvelle, actuelle):
+            nb_ameliorations += 1
+            essayes.clear()
+            if stats is not None:
+                stats.ameliorer(nouvelle[1])
+        else:
+            for k, ms in anciens.items():
+                for e in list(groupes[k].members):
+                    groupes[k].remove_member(e)
+                for e in ms:
+                    groupes[k].add_member(e)
+    return nb_ameliorations
+
+
+def _meilleure(q: Tuple[int, float, int], r: Tuple[int, float, int]) -> bool:
+    if q[0] != r[0]:
+        return q[0] < r[0]
+    if abs(q[1] - r[1]) > EPS:
+        return q[1] < r[1]
+    return q[2] < r[2]
+
+
+def _remplacer(groupes: Sequence[GroupeProjet], choisis: Sequence[int], membres: Sequence,
+               affectation: Sequence[int]):
+    # Vide les groupes choisis puis place chaque membre dans son nouveau groupe
+    for k in choisis:
+        for e in list(groupes[k].members):
+            groupes[k].remove_member(e)
+    for e, rang in zip(membres, affectation):
+        groupes[choisis[rang]].add_member(e)
+
+
+""" Répartition gloutonne de g, puis recherche à grand voisinage pendant budget_s secondes.
+strict et amelioration sont passés au glouton (la recherche locale a aussi budget_s).
+"""
+def creer_groupes_voisinage(g: GroupeTP, nb_groupes: int, budget_s: float = 2.0, taille: int = 2,
+                            graine: int = 0, stats: Optional[Statistiques] = None, strict: bool = False,
+                            amelioration: bool = False) -> Dict:
+    groupes = creer_groupes_glouton(g, nb_groupes, amelioration=amelioration, budget_s=budget_s, stats=stats,
+                                    strict=strict)
+    if not groupes:
+        return groupes
+    rep = Repartition(*groupes.values())
+    nb = voisinage_large(rep, budget_s, taille, graine, stats=stats)
+    print(f"Grand voisinage : {nb} ré-optimisation(s) gardée(s)")
+    afficher_score(rep, "Score d'équilibre après grand voisinage")
+    return groupes
@@ -1,40 +1,112 @@
-from typing import Dict
-from openpyxl import load_workbook
+from typing import Dict, Iterator, Optional, Sequence, Set, Tuple
 from models import Etudiant, GroupeTP
 
+# Colonnes lues dans la feuille
+COLONNES = ('Prénom', 'Groupe', 'Avantage compté', '« chef »', 'À séparer')
+
+
 class Row(object):
 
-    def __init__(self, head, row):
-        self.head = head
+    def __init__(self, index, row):
+        self.index = index
         self.row = row
 
     def __getitem__(self, item):
-        for i, c in enumerate(self.head):
-            if c.value == item:
-                return self.row[i].value
-        raise KeyError(item)
+        i = self.index[item]
+        return self.row[i] if i < len(self.row) else None
+
+
+""" Associe chaque nom de colonne à sa position, et signale d'emblée les colonnes absentes. """
+def index_colonnes(head: Sequence, colonnes: Sequence[str] = COLONNES) -> Dict[str, int]:
+    index = {}
+    for i, nom in enumerate(head):
+        if nom is not None:
+            index.setdefault(nom, i)
+    manquantes = [c for c in colonnes if c not in index]
+    if manquantes:
+        raise ValueError(f"Colonne(s) manquante(s) ou renommée(s) : {manquantes} "
+                         f"(colonnes trouvées : {list(index)})")
+    return index
 
-""" Charge les groupes et étudiants depuis un fichier Excel. """
-def load_groups(filename, sheet) -> Dict:
+""" Ensemble des noms de groupes demandés (None : tous les groupes). """
+def noms_groupes(groupes) -> Optional[Set]:
+    if groupes is None:
+        return None
+    if isinstance(groupes, str):
+        return {groupes}
+    return set(groupes)
+
+""" Parcourt la feuille et produit (nom du groupe, étudiant) pour les groupes demandés.
+Les lignes des autres groupes sont écartées avant toute création d'objet.
+consecutifs : les lignes d'un même groupe se suivent ; la lecture s'arrête alors
+dès que le bloc du dernier groupe demandé est refermé.
+"""
+def lire_etudiants(filename, sheet, groupes=None, consecutifs=False) -> Iterator[Tuple[str, Etudiant]]:
+    # Import tardif : openpyxl n'est chargé que si le classeur doit être lu
+    from openpyxl import load_workbook
+
+    noms = noms_groupes(groupes)
     # Charger le fichier Excel en mode lecture seule
     wb = load_workbook(filename=filename, data_only=True, read_only=True)
-    # Sélectionner la feuille spécifiée
-    sh = wb[sheet]
-    # Lire l'en-tête et les lignes de données
-    head, *rows = sh.rows
-    res = {}
-    # Parcourir chaque ligne et créer les objets correspondants
-    for r in rows:
-        r = Row(head, r)
-        nom_groupe = r['Groupe']
-        if nom_groupe:
-            groupe = res.setdefault(nom_groupe, GroupeTP(nom_groupe, etudiants=()))
-            etudiant = Etudiant(nom=r['Prénom'].split()[-1],
-                                prenom=r['Prénom'].split()[-1],
-                                avantage=r['Avantage compté'],
-                                leader=bool(r['« chef »']),
-                                polarite=r['À séparer'])
-            groupe.etudiants.append(etudiant)
+    try:
+        # Parcourir les lignes en flux, valeurs seules, sans matérialiser la feuille
+        rows = wb[sheet].iter_rows(values_only=True)
+        # Lire l'en-tête une seule fois
+        index = index_colonnes(next(rows, ()))
+        termines = set()
+        precedent = None
+        for r in rows:
+            r = Row(index, r)
+            nom_groupe = r['Groupe']
+            if not nom_groupe:
+                continue
+            if consecutifs and noms is not None and nom_groupe != precedent:
+                # Le bloc du groupe précédent est refermé
+                termines.add(precedent)
+                if noms <= termines:
+                    return
+                precedent = nom_groupe
+            if noms is not None and nom_groupe not in noms:
+                continue
+            prenom = r['Prénom'].split()[-1]
+            yield nom_groupe, Etudiant(nom=prenom,
+                                       prenom=prenom,
+                                       avantage=r['Avantage compté'],
+                                       leader=bool(r['« chef »']),
+                                       polarite=r['À séparer'])
+    finally:
+        wb.close()
 
+""" Charge les groupes et étudiants depuis un fichier Excel.
+groupes : nom ou liste de noms des groupes à charger (None : tous).
+"""
+def load_groups(filename, sheet, groupes=None) -> Dict:
+    res = {}
+    for nom_groupe, etudiant in lire_etudiants(filename, sheet, groupes):
+        groupe = res.setdefault(nom_groupe, GroupeTP(nom_groupe, etudiants=()))
+        groupe.etudiants.append(etudiant)
     return res
 
+""" Produit les groupes un à un, au fil de la lecture.
+Les lignes d'un même groupe doivent être consécutives (c'est le cas de l'export) ;
+la lecture s'arrête dès que tous les groupes demandés ont été produits.
+"""
+def iter_groups(filename, sheet, groupes=None) -> Iterator[GroupeTP]:
+    noms = noms_groupes(groupes)
+    vus = set()
+    courant = None
+    lignes = lire_etudiants(filename, sheet, noms, consecutifs=True)
+    try:
+        for nom_groupe, etudiant in lignes:
+            if courant is None or nom_groupe != courant.nom:
+                if nom_groupe in vus:
+                    raise ValueError(f"Lignes du groupe {nom_groupe} non consécutives : utiliser load_groups")
+                if courant is not None:
+                    yield courant
+                vus.add(nom_groupe)
+                courant = GroupeTP(nom_groupe, etudiants=())
+            courant.etudiants.append(etudiant)
+        if courant is not None:
+            yield courant
+    finally:
+        lignes.close()